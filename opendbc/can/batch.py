@@ -0,0 +1,132 @@
+import math
+from typing import NamedTuple
+
+import numpy as np
+
+from opendbc.can.batch_checksums import get_batch_checksum
+from opendbc.can.dbc import Msg, Signal, SignalType, get_checksum_context
+
+MAX_BAD_COUNTER = 5
+
+
+class BatchResult(NamedTuple):
+  nanos: np.ndarray
+  vals: dict[str, np.ndarray]
+  counter_valid: np.ndarray
+  checksum_valid: np.ndarray
+
+
+def signal_steps(sig: Signal, dat_len: int) -> list[tuple[int, int, int, int]]:
+  """Byte-level (byte index, shift, mask, output shift) steps, matching the walk in parser.get_raw_value"""
+  steps = []
+  i = sig.msb // 8
+  bits = sig.size
+  while 0 <= i < dat_len and bits > 0:
+    lsb = sig.lsb if (sig.lsb // 8) == i else i * 8
+    msb = sig.msb if (sig.msb // 8) == i else (i + 1) * 8 - 1
+    size = msb - lsb + 1
+    steps.append((i, lsb - (i * 8), (1 << size) - 1, bits - size))
+    bits -= size
+    i = i - 1 if sig.is_little_endian else i + 1
+  return steps
+
+
+def get_raw_values(dat: np.ndarray, sig: Signal) -> np.ndarray:
+  """Raw signal values for every row of an N x len uint8 payload array, sign extended for signed signals"""
+  ret = np.zeros(dat.shape[0], dtype=np.uint64)
+  for i, shift, mask, out_shift in signal_steps(sig, dat.shape[1]):
+    ret |= ((dat[:, i] >> np.uint8(shift)) & np.uint8(mask)).astype(np.uint64) << np.uint64(out_shift)
+
+  if not sig.is_signed:
+    return ret
+  # flipping the sign bit and subtracting it sign extends, wrapping in uint64 so 63 and 64-bit signals don't overflow
+  sign_bit = np.uint64(1 << (sig.size - 1))
+  return ((ret ^ sign_bit) - sign_bit).view(np.int64)
+
+
+def counter_valid(counters: np.ndarray, size: int) -> np.ndarray:
+  """Whether each counter value follows its predecessor, the first frame is always valid"""
+  ret = np.ones(len(counters), dtype=bool)
+  counters = counters.astype(np.int64)
+  ret[1:] = ((counters[:-1] + 1) & ((1 << size) - 1)) == counters[1:]
+  return ret
+
+
+def rolling_counter_valid(counters: np.ndarray, size: int, max_bad: int = MAX_BAD_COUNTER, counter: int = 0, counter_fail: int = 0) -> np.ndarray:
+  """
+  Counter validity after each frame as MessageState.update_counter tracks it: each frame that doesn't follow its
+  predecessor adds a failure and each one that does removes one, within [0, max_bad], and the counter is valid
+  while below max_bad. counter and counter_fail are the state before the first frame.
+  """
+  counters = np.asarray(counters, dtype=np.int64)
+  if len(counters) == 0:
+    return np.ones(0, dtype=bool)
+  prev = np.concatenate(([counter], counters[:-1]))
+  bad = ((prev + 1) & ((1 << size) - 1)) != counters
+
+  # each frame maps the failure count before it to the one after it. Those maps are composed within blocks of
+  # frames, stepping through the positions of all blocks at once, then chained from block to block
+  n = len(counters)
+  states = np.arange(max_bad + 1, dtype=np.int8)
+  step = np.stack([np.maximum(states - 1, 0), np.minimum(states + 1, max_bad)])  # [bad, count before] -> count after
+  block = math.isqrt(n) + 1
+  n_blocks = -(-n // block)
+  bad_blocks = np.zeros(n_blocks * block, dtype=np.intp)
+  bad_blocks[:n] = bad
+  bad_blocks = bad_blocks.reshape(n_blocks, block)[:, :, None]
+
+  # count after each frame of a block, for every count the block starts with. The padding after
+  # the last frame doesn't matter, since nothing reads past it
+  prefix = np.empty((n_blocks, block, max_bad + 1), dtype=np.int8)
+  cur = np.tile(states, (n_blocks, 1))
+  for j in range(block):
+    cur = step[bad_blocks[:, j], cur]
+    prefix[:, j] = cur
+
+  entry = np.empty(n_blocks, dtype=np.intp)
+  fail = counter_fail
+  for b in range(n_blocks):
+    entry[b] = fail
+    fail = prefix[b, -1, fail]
+  return np.take_along_axis(prefix, entry[:, None, None], axis=2).reshape(-1)[:n] < max_bad
+
+
+def checksum_valid(address: int, sig: Signal, dat: np.ndarray, received: np.ndarray) -> np.ndarray:
+  calc_batch = get_batch_checksum(address, sig)
+  if calc_batch is not None:
+    return calc_batch(dat) == received
+  calc = get_checksum_context(address, sig)
+  expected = np.array([calc(row.tobytes()) for row in dat], dtype=np.int64)
+  return expected == received
+
+
+def decode_batch(msg: Msg, dat: np.ndarray, nanos: np.ndarray, ignore_checksum: bool = False,
+                 ignore_counter: bool = False) -> BatchResult:
+  """
+  Decode a batch of frames of one message into one column per signal, multiplexed signals are NaN in frames that don't carry them.
+  dat is an N x len uint8 array of payloads, nanos the N frame timestamps.
+  """
+  dat = np.ascontiguousarray(dat, dtype=np.uint8)
+  if dat.ndim != 2:
+    raise ValueError(f"expected a 2-D payload array, got shape {dat.shape}")
+  nanos = np.asarray(nanos, dtype=np.uint64)
+  if len(nanos) != dat.shape[0]:
+    raise ValueError(f"got {dat.shape[0]} payloads but {len(nanos)} timestamps")
+
+  vals: dict[str, np.ndarray] = {}
+  counter_ok = np.ones(dat.shape[0], dtype=bool)
+  checksum_ok = np.ones(dat.shape[0], dtype=bool)
+  mux = next((sig for sig in msg.sigs.values() if sig.multiplexer and sig.multiplex_value is None), None)
+  mux_values = get_raw_values(dat, mux) if mux is not None else None
+  for sig in msg.sigs.values():
+    raw = get_raw_values(dat, sig)
+    if not ignore_checksum and sig.calc_checksum is not None:
+      checksum_ok &= checksum_valid(msg.address, sig, dat, raw)
+    if not ignore_counter and sig.type == SignalType.COUNTER:
+      counter_ok &= counter_valid(raw, sig.size)
+    vals[sig.name] = raw * sig.factor + sig.offset
+    if mux_values is not None and sig.multiplex_value is not None:
+      # NaN where the multiplexer selects other signals
+      vals[sig.name][mux_values != sig.multiplex_value] = np.nan
+
+  return BatchResult(nanos, vals, counter_ok, checksum_ok)
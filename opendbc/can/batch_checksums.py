@@ -0,0 +1,179 @@
+from collections.abc import Callable
+
+import numpy as np
+
+from opendbc.can.dbc import Signal
+from opendbc.car.body.bodycan import body_checksum
+from opendbc.car.chrysler.chryslercan import chrysler_checksum, fca_giorgio_checksum
+from opendbc.car.crc import CRC8H2F, CRC8J1850, CRC16_XMODEM, _gen_crc8_table
+from opendbc.car.honda.hondacan import honda_checksum
+from opendbc.car.hyundai.hyundaicanfd import HKG_CAN_FD_LENGTH_XOR, hkg_can_fd_checksum
+from opendbc.car.psa.psacan import psa_checksum
+from opendbc.car.subaru.subarucan import subaru_checksum
+from opendbc.car.tesla.teslacan import tesla_checksum
+from opendbc.car.toyota.toyotacan import toyota_checksum
+from opendbc.car.volkswagen.mlbcan import VOLKSWAGEN_MLB_XOR_STARTING_VALUES, volkswagen_mlb_checksum
+from opendbc.car.volkswagen.mqbcan import VOLKSWAGEN_MQB_MEB_CONSTANTS, volkswagen_mqb_meb_checksum, xor_checksum
+
+# Vectorized versions of the checksums in get_checksum_state. Like the scalar checksum contexts, each is set up
+# once per message and returns a function taking an N x len uint8 payload array and returning the N checksums.
+
+BatchChecksum = Callable[[np.ndarray], np.ndarray]
+
+CRC8H2F_NP = np.array(CRC8H2F, dtype=np.uint8)
+CRC8J1850_NP = np.array(CRC8J1850, dtype=np.uint8)
+CRC8_BODY_NP = np.array(_gen_crc8_table(0xD5), dtype=np.uint8)
+CRC16_XMODEM_NP = np.array(CRC16_XMODEM, dtype=np.uint16)
+
+
+def _crc8(table: np.ndarray, crc: np.ndarray, cols: np.ndarray) -> np.ndarray:
+  # one table lookup per payload column, across all rows at once
+  for j in range(cols.shape[1]):
+    crc = table[crc ^ cols[:, j]]
+  return crc
+
+
+def _crc16_xmodem(crc: np.ndarray, cols: np.ndarray) -> np.ndarray:
+  for j in range(cols.shape[1]):
+    crc = (crc << np.uint16(8)) ^ CRC16_XMODEM_NP[(crc >> np.uint16(8)) ^ cols[:, j]]
+  return crc
+
+
+def _nibble_sums(dat: np.ndarray) -> np.ndarray:
+  return ((dat & 0xF) + (dat >> 4)).sum(axis=1, dtype=np.int64)
+
+
+def _byte_sum(address: int) -> int:
+  s = 0
+  while address:
+    s += address & 0xFF
+    address >>= 8
+  return s
+
+
+def honda_checksum_batch(address: int, sig: Signal) -> BatchChecksum:
+  s = 0
+  addr = address
+  while addr:
+    s += addr & 0xF
+    addr >>= 4
+  base = 8 - s + (3 if address > 0x7FF else 0)
+
+  def calc(dat: np.ndarray) -> np.ndarray:
+    if dat.shape[1] == 0:
+      return np.full(dat.shape[0], base & 0xF, dtype=np.int64)
+    return (base - _nibble_sums(dat) + (dat[:, -1] & 0xF)) & 0xF
+  return calc
+
+
+def toyota_checksum_batch(address: int, sig: Signal) -> BatchChecksum:
+  s = _byte_sum(address)
+  return lambda dat: (s + dat.shape[1] + dat[:, :-1].sum(axis=1, dtype=np.int64)) & 0xFF
+
+
+def subaru_checksum_batch(address: int, sig: Signal) -> BatchChecksum:
+  s = _byte_sum(address)
+  return lambda dat: (s + dat[:, 1:].sum(axis=1, dtype=np.int64)) & 0xFF
+
+
+def chrysler_checksum_batch(address: int, sig: Signal) -> BatchChecksum:
+  # the bitwise loop in chrysler_checksum is the SAE J1850 CRC8 with 0xFF init and inverted output
+  return lambda dat: (~_crc8(CRC8J1850_NP, np.full(dat.shape[0], 0xFF, dtype=np.uint8), dat[:, :-1])).astype(np.int64) & 0xFF
+
+
+def fca_giorgio_checksum_batch(address: int, sig: Signal) -> BatchChecksum:
+  final_xor = {0xDE: 0x10, 0x106: 0xF6, 0x122: 0xF1}.get(address, 0x0A)
+  return lambda dat: _crc8(CRC8J1850_NP, np.zeros(dat.shape[0], dtype=np.uint8), dat[:, :-1]).astype(np.int64) ^ final_xor
+
+
+def hkg_can_fd_checksum_batch(address: int, sig: Signal) -> BatchChecksum:
+  addr_crc = 0
+  for b in (address & 0xFF, (address >> 8) & 0xFF):
+    addr_crc = ((addr_crc << 8) ^ CRC16_XMODEM[(addr_crc >> 8) ^ b]) & 0xFFFF
+
+  def calc(dat: np.ndarray) -> np.ndarray:
+    crc = np.zeros(dat.shape[0], dtype=np.uint16)
+    crc = _crc16_xmodem(crc, dat[:, 2:])
+    crc = _crc16_xmodem(crc, np.zeros((dat.shape[0], 2), dtype=np.uint8))
+    return crc.astype(np.int64) ^ addr_crc ^ HKG_CAN_FD_LENGTH_XOR.get(dat.shape[1], 0)
+  return calc
+
+
+def volkswagen_mqb_meb_checksum_batch(address: int, sig: Signal) -> BatchChecksum:
+  const = VOLKSWAGEN_MQB_MEB_CONSTANTS.get(address)
+  const_np = np.array(const, dtype=np.uint8) if const else None
+
+  def calc(dat: np.ndarray) -> np.ndarray:
+    crc = _crc8(CRC8H2F_NP, np.full(dat.shape[0], 0xFF, dtype=np.uint8), dat[:, 1:])
+    if const_np is not None:
+      crc = CRC8H2F_NP[crc ^ const_np[dat[:, 1] & 0x0F]]
+    return crc.astype(np.int64) ^ 0xFF
+  return calc
+
+
+def xor_checksum_batch(address: int, sig: Signal, initial_value: int = 0) -> BatchChecksum:
+  checksum_byte = sig.start_bit // 8
+
+  def calc(dat: np.ndarray) -> np.ndarray:
+    cols = [j for j in range(dat.shape[1]) if j != checksum_byte]
+    checksum = np.full(dat.shape[0], initial_value, dtype=np.int64)
+    if cols:
+      checksum ^= np.bitwise_xor.reduce(dat[:, cols], axis=1)
+    return checksum
+  return calc
+
+
+def volkswagen_mlb_checksum_batch(address: int, sig: Signal) -> BatchChecksum:
+  if address in VOLKSWAGEN_MLB_XOR_STARTING_VALUES:
+    return xor_checksum_batch(address, sig, VOLKSWAGEN_MLB_XOR_STARTING_VALUES[address])
+  return volkswagen_mqb_meb_checksum_batch(address, sig)
+
+
+def tesla_checksum_batch(address: int, sig: Signal) -> BatchChecksum:
+  base = (address & 0xFF) + ((address >> 8) & 0xFF)
+  checksum_byte = sig.start_bit // 8
+
+  def calc(dat: np.ndarray) -> np.ndarray:
+    s = base + dat.sum(axis=1, dtype=np.int64)
+    if checksum_byte < dat.shape[1]:
+      s -= dat[:, checksum_byte]
+    return s & 0xFF
+  return calc
+
+
+def psa_checksum_batch(address: int, sig: Signal) -> BatchChecksum:
+  chk_ini = {0x452: 0x4, 0x38D: 0x7, 0x42D: 0xC}.get(address, 0xB)
+  byte = sig.start_bit // 8
+  high_nibble = sig.start_bit % 8 >= 4
+
+  def calc(dat: np.ndarray) -> np.ndarray:
+    own = (dat[:, byte] >> 4) if high_nibble else (dat[:, byte] & 0xF)
+    return (chk_ini - (_nibble_sums(dat) - own)) & 0xF
+  return calc
+
+
+def body_checksum_batch(address: int, sig: Signal) -> BatchChecksum:
+  # CRC8 with polynomial 0xD5 over every byte but the last, in reverse order
+  return lambda dat: _crc8(CRC8_BODY_NP, np.full(dat.shape[0], 0xFF, dtype=np.uint8), dat[:, -2::-1]).astype(np.int64)
+
+
+BATCH_CHECKSUMS: dict[Callable, Callable[[int, Signal], BatchChecksum]] = {
+  honda_checksum: honda_checksum_batch,
+  toyota_checksum: toyota_checksum_batch,
+  subaru_checksum: subaru_checksum_batch,
+  chrysler_checksum: chrysler_checksum_batch,
+  fca_giorgio_checksum: fca_giorgio_checksum_batch,
+  hkg_can_fd_checksum: hkg_can_fd_checksum_batch,
+  volkswagen_mqb_meb_checksum: volkswagen_mqb_meb_checksum_batch,
+  volkswagen_mlb_checksum: volkswagen_mlb_checksum_batch,
+  xor_checksum: xor_checksum_batch,
+  tesla_checksum: tesla_checksum_batch,
+  psa_checksum: psa_checksum_batch,
+  body_checksum: body_checksum_batch,
+}
+
+
+def get_batch_checksum(address: int, sig: Signal) -> BatchChecksum | None:
+  """Vectorized checksum of sig in the message at address, None if the checksum has no vectorized version"""
+  make_batch = BATCH_CHECKSUMS.get(sig.calc_checksum)
+  return make_batch(address, sig) if make_batch is not None else None
@@ -1,22 +1,29 @@
 import re
 import os
-from collections.abc import Callable
+import shutil
+import hashlib
+import marshal
+import tempfile
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
 from dataclasses import dataclass
-from functools import cache
+
+import numpy as np
 
 from opendbc import DBC_PATH
 
 # TODO: these should just be passed in along with the DBC file
-from opendbc.car.honda.hondacan import honda_checksum
-from opendbc.car.toyota.toyotacan import toyota_checksum
-from opendbc.car.subaru.subarucan import subaru_checksum
-from opendbc.car.chrysler.chryslercan import chrysler_checksum, fca_giorgio_checksum
-from opendbc.car.hyundai.hyundaicanfd import hkg_can_fd_checksum
-from opendbc.car.volkswagen.mlbcan import volkswagen_mlb_checksum
-from opendbc.car.volkswagen.mqbcan import volkswagen_mqb_meb_checksum, xor_checksum
-from opendbc.car.tesla.teslacan import tesla_checksum
+from opendbc.car.honda.hondacan import honda_checksum, honda_checksum_context
+from opendbc.car.toyota.toyotacan import toyota_checksum, toyota_checksum_context
+from opendbc.car.subaru.subarucan import subaru_checksum, subaru_checksum_context
+from opendbc.car.chrysler.chryslercan import chrysler_checksum, fca_giorgio_checksum, fca_giorgio_checksum_context
+from opendbc.car.hyundai.hyundaicanfd import hkg_can_fd_checksum, hkg_can_fd_checksum_context
+from opendbc.car.volkswagen.mlbcan import volkswagen_mlb_checksum, volkswagen_mlb_checksum_context
+from opendbc.car.volkswagen.mqbcan import volkswagen_mqb_meb_checksum, volkswagen_mqb_meb_checksum_context, xor_checksum, xor_checksum_context
+from opendbc.car.tesla.teslacan import tesla_checksum, tesla_checksum_context
 from opendbc.car.body.bodycan import body_checksum
-from opendbc.car.psa.psacan import psa_checksum
+from opendbc.car.psa.psacan import psa_checksum, psa_checksum_context
 
 
 class SignalType:
@@ -48,6 +55,8 @@ class Signal:
   offset: float
   is_little_endian: bool
   type: int = SignalType.DEFAULT
+  multiplexer: bool = False  # the message's multiplexer switch, M
+  multiplex_value: int | None = None  # only present when the multiplexer has this value, mN
   calc_checksum: 'Callable[[int, Signal, bytearray], int] | None' = None
 
 
@@ -67,89 +76,428 @@ class Val:
   sigs: dict[str, Signal] | None = None
 
 
-BO_RE = re.compile(r"^BO_ (\w+) (\w+) *: (\w+) (\w+)")
-SG_RE = re.compile(r"^SG_ (\w+) : (\d+)\|(\d+)@(\d)([+-]) \(([0-9.+\-eE]+),([0-9.+\-eE]+)\) \[[0-9.+\-eE]+\|[0-9.+\-eE]+\] \".*\" .*")
-SGM_RE = re.compile(r"^SG_ (\w+) (\w+) *: (\d+)\|(\d+)@(\d)([+-]) \(([0-9.+\-eE]+),([0-9.+\-eE]+)\) \[[0-9.+\-eE]+\|[0-9.+\-eE]+\] \".*\" .*")
-VAL_RE = re.compile(r"^VAL_ (\w+) (\w+) (.*);")
-VAL_SPLIT_RE = re.compile(r'["]+')
+# single pass over a DBC: each BO_ header along with its block of SG_ lines, SG_ lines separated from their BO_
+# by other lines, and VAL_ lines. every pattern starts with a literal newline, which lets the regex engine skip
+# ahead to candidate lines
+TOKENS_RE = re.compile(r'\n[ \t]*(?:BO_ ([^\n]*)((?:\n[ \t]*SG_ [^\n]*)*)|(SG_ [^\n]*(?:\n[ \t]*SG_ [^\n]*)*)|VAL_ ([^\n]*))')
+# one match per line of a SG_ block, lines that aren't valid signals give empty groups
+NUM = r'[0-9.+\-eE]+'
+SG_TOKENS_RE = re.compile(rf'\n[ \t]*(?:SG_ (\w+) (?:(\w+) *)?: (\d+)\|(\d+)@([01])([+-]) \(({NUM}),({NUM})\) \[{NUM}\|{NUM}\] ".*" .*|.*)')
+
+# when set, compiled DBCs are cached in this directory keyed by file content. signal types aren't cached,
+# they come from the rules in this file and are set again on every load
+DBC_CACHE_DIR = os.environ.get("DBC_CACHE_DIR", "")
+DBC_CACHE_VERSION = 3  # bump when the parsed representation changes
+
+# index messages up front and parse their signals on first use, instead of parsing the whole file
+DBC_LAZY_LOAD = os.environ.get("DBC_LAZY_LOAD", "0") == "1"
+
+# when set, DBCs are compiled once into read-only tables in this directory and memory-mapped, so processes
+# loading the same DBC share the pages and only build Python objects for the messages they use
+DBC_SHARED_DIR = os.environ.get("DBC_SHARED_DIR", "")
+
+# budget for the DBCs held by get_dbc, in estimated bytes of parsed Python objects
+DBC_REGISTRY_MAX_BYTES = int(os.environ.get("DBC_REGISTRY_MAX_BYTES", 64 * 1024 * 1024))
+
+# rough in-memory size of parsed objects, including names and dict entries
+MSG_BYTES = 400
+SIGNAL_BYTES = 320
+VAL_BYTES = 200
 
 
-@cache
 class DBC:
-  def __init__(self, name: str):
+  def __init__(self, name: str, lazy: bool | None = None):
     dbc_path = name
     if not os.path.exists(dbc_path):
       dbc_path = os.path.join(DBC_PATH, name + ".dbc")
 
-    self._parse(dbc_path)
+    self._vals: list[Val] = []
+    self._val_loader: Callable[[], list[Val]] | None = None
+    self._load(dbc_path, DBC_LAZY_LOAD if lazy is None else lazy)
 
-  def _parse(self, path: str):
+  def _load(self, path: str, lazy: bool):
     self.name = os.path.basename(path).replace(".dbc", "")
-    with open(path) as f:
-      lines = f.readlines()
+    with open(path, "rb") as f:
+      content = f.read()
+
+    if DBC_SHARED_DIR:
+      # the mapped tables are already lazy, signals are built on first access
+      self._load_shared(os.path.join(DBC_SHARED_DIR, get_cache_key(self.name, content)), content)
+      return
+
+    if lazy:
+      # the compiled cache holds every message, so it isn't used here
+      self._index(content.decode("utf-8"))
+      return
+
+    cache_path = get_cache_path(self.name, content)
+    if cache_path is not None and self._load_cache(cache_path):
+      return
+
+    self._parse(content.decode("utf-8"))
+    if cache_path is not None:
+      self._save_cache(cache_path)
+
+  def _load_cache(self, cache_path: str) -> bool:
+    try:
+      with open(cache_path, "rb") as f:
+        self._from_tables(marshal.loads(f.read()))
+    except (OSError, EOFError, ValueError, TypeError):
+      # missing, corrupt, or from an incompatible version: re-parse and overwrite
+      return False
+    return True
+
+  def _save_cache(self, cache_path: str) -> None:
+    try:
+      os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+      # write then rename, so concurrent readers never see a partial file
+      with tempfile.NamedTemporaryFile("wb", dir=os.path.dirname(cache_path), delete=False) as f:
+        f.write(marshal.dumps(self._to_tables()))
+      os.replace(f.name, cache_path)
+    except OSError:
+      pass
+
+  def _load_shared(self, tables_path: str, content: bytes) -> None:
+    if not os.path.isdir(tables_path):
+      self._parse(content.decode("utf-8"))
+      self._save_shared(tables_path)
+
+    msgs = np.load(os.path.join(tables_path, "msgs.npy"), mmap_mode="r")
+    sigs = np.load(os.path.join(tables_path, "sigs.npy"), mmap_mode="r")
+    vals = np.load(os.path.join(tables_path, "vals.npy"), mmap_mode="r")
+
+    checksum_state = get_checksum_state(self.name)
+    self.msgs = {}
+    self.addr_to_msg = {}
+    self.name_to_msg = {}
+    self._vals = []
+    for msg_name, address, size, sig_start, sig_end in msgs.tolist():
+      msg = LazyMsg(msg_name.decode(), address, size)
+      msg.set_loader(self._table_loader(sigs, sig_start, sig_end, checksum_state))
+      self.msgs[address] = msg
+      self.addr_to_msg[address] = msg
+      self.name_to_msg[msg.name] = msg
+    self._val_loader = lambda: [Val(name.decode(), address, def_val.decode()) for name, address, def_val in vals.tolist()]
+
+  def _save_shared(self, tables_path: str) -> None:
+    sig_rows = []
+    msg_rows = []
+    for msg in self.msgs.values():
+      msg_rows.append((msg.name.encode(), msg.address, msg.size, len(sig_rows), len(sig_rows) + len(msg.sigs)))
+      sig_rows += [(sig.name.encode(), sig.start_bit, sig.msb, sig.lsb, sig.size, sig.is_signed, sig.factor, sig.offset,
+                    sig.is_little_endian, sig.multiplexer, -1 if sig.multiplex_value is None else sig.multiplex_value)
+                   for sig in msg.sigs.values()]
+    val_rows = [(val.name.encode(), val.address, val.def_val.encode()) for val in self.vals]
 
+    # strings are stored fixed width, so size them to the longest in this DBC
+    def width(rows: list[tuple], *cols: int) -> int:
+      return max((len(row[col]) for row in rows for col in cols), default=1)
+
+    msg_dtype = np.dtype([("name", f"S{width(msg_rows, 0)}"), ("address", "<u8"), ("size", "<u4"), ("sig_start", "<u4"), ("sig_end", "<u4")])
+    sig_dtype = np.dtype([("name", f"S{width(sig_rows, 0)}"), ("start_bit", "<i4"), ("msb", "<i4"), ("lsb", "<i4"), ("size", "<i4"),
+                          ("is_signed", "?"), ("factor", "<f8"), ("offset", "<f8"), ("is_little_endian", "?"),
+                          ("multiplexer", "?"), ("multiplex_value", "<i4")])
+    val_dtype = np.dtype([("name", f"S{width(val_rows, 0)}"), ("address", "<u8"), ("def_val", f"S{width(val_rows, 2)}")])
+
+    # write into a temporary directory then rename, so concurrent readers never see partial tables
+    os.makedirs(os.path.dirname(tables_path), exist_ok=True)
+    tmp_path = tempfile.mkdtemp(dir=os.path.dirname(tables_path))
+    try:
+      np.save(os.path.join(tmp_path, "msgs.npy"), np.array(msg_rows, dtype=msg_dtype))
+      np.save(os.path.join(tmp_path, "sigs.npy"), np.array(sig_rows, dtype=sig_dtype))
+      np.save(os.path.join(tmp_path, "vals.npy"), np.array(val_rows, dtype=val_dtype))
+      os.rename(tmp_path, tables_path)
+    except OSError:
+      # another process got there first
+      if not os.path.isdir(tables_path):
+        raise
+    finally:
+      shutil.rmtree(tmp_path, ignore_errors=True)
+
+  def _table_loader(self, sigs: np.ndarray, start: int, end: int, checksum_state: 'ChecksumState | None') -> Callable[[], dict[str, Signal]]:
+    def load() -> dict[str, Signal]:
+      ret = {}
+      for row in sigs[start:end].tolist():
+        sig = Signal(row[0].decode(), *row[1:9], multiplexer=row[9], multiplex_value=None if row[10] < 0 else row[10])
+        set_signal_type(sig, checksum_state, self.name, 0)
+        ret[sig.name] = sig
+      return ret
+    return load
+
+  def _to_tables(self) -> tuple:
+    # plain tuples marshal and load much faster than pickled dataclasses
+    msgs = [(msg.name, msg.address, msg.size, [(sig.name, sig.start_bit, sig.msb, sig.lsb, sig.size, sig.is_signed, sig.factor,
+                                                 sig.offset, sig.is_little_endian, sig.multiplexer, sig.multiplex_value)
+                                                for sig in msg.sigs.values()])
+            for msg in self.msgs.values()]
+    names = [(name, msg.address) for name, msg in self.name_to_msg.items()]
+    vals = [(val.name, val.address, val.def_val) for val in self.vals]
+    return msgs, names, vals
+
+  def _from_tables(self, tables: tuple) -> None:
+    msgs, names, vals = tables
+    checksum_state = get_checksum_state(self.name)
+    self.msgs = {}
+    for msg_name, address, size, sig_rows in msgs:
+      sigs = {}
+      for row in sig_rows:
+        sig = Signal(*row[:9], multiplexer=row[9], multiplex_value=row[10])
+        set_signal_type(sig, checksum_state, self.name, 0)
+        sigs[sig.name] = sig
+      self.msgs[address] = Msg(msg_name, address, size, sigs)
+    self.addr_to_msg = dict(self.msgs)
+    self.name_to_msg = {name: self.msgs[address] for name, address in names}
+    self._vals = [Val(*row) for row in vals]
+
+  def _parse(self, content: str):
     checksum_state = get_checksum_state(self.name)
-    be_bits = [j + i * 8 for i in range(64) for j in range(7, -1, -1)]
     self.msgs: dict[int, Msg] = {}
     self.addr_to_msg: dict[int, Msg] = {}
     self.name_to_msg: dict[str, Msg] = {}
-    self.vals: list[Val] = []
-    address = 0
-    signals_temp: dict[int, dict[str, Signal]] = {}
-    for line_num, line in enumerate(lines, 1):
-      line = line.strip()
-      if line.startswith("BO_ "):
-        m = BO_RE.match(line)
-        if not m:
-          continue
-        address = int(m.group(1), 0)
-        msg_name = m.group(2)
-        size = int(m.group(3), 0)
-        sigs = {}
-        self.msgs[address] = Msg(msg_name, address, size, sigs)
-        self.addr_to_msg[address] = self.msgs[address]
-        self.name_to_msg[msg_name] = self.msgs[address]
-        signals_temp[address] = sigs
-      elif line.startswith("SG_ "):
-        m = SG_RE.search(line)
-        offset = 0
-        if not m:
-          m = SGM_RE.search(line)
-          if not m:
-            continue
-          offset = 1
-        sig_name = m.group(1)
-        start_bit = int(m.group(2 + offset))
-        size = int(m.group(3 + offset))
-        is_little_endian = m.group(4 + offset) == "1"
-        is_signed = m.group(5 + offset) == "-"
-        factor = float(m.group(6 + offset))
-        offset_val = float(m.group(7 + offset))
-
-        if is_little_endian:
-          lsb = start_bit
-          msb = start_bit + size - 1
-        else:
-          idx = be_bits.index(start_bit)
-          lsb = be_bits[idx + size - 1]
-          msb = start_bit
-
-        sig = Signal(sig_name, start_bit, msb, lsb, size, is_signed, factor, offset_val, is_little_endian)
-        set_signal_type(sig, checksum_state, self.name, line_num)
-        signals_temp[address][sig_name] = sig
-      elif line.startswith("VAL_ "):
-        m = VAL_RE.search(line)
-        if not m:
-          continue
-        val_addr = int(m.group(1), 0)
-        sgname = m.group(2)
-        defs = m.group(3)
-        words = [w.strip() for w in VAL_SPLIT_RE.split(defs) if w.strip()]
-        words = [w.upper().replace(" ", "_") for w in words]
-        val_def = " ".join(words).strip()
-        self.vals.append(Val(sgname, val_addr, val_def))
-    for addr, sigs in signals_temp.items():
-      self.msgs[addr].sigs = sigs
+    self._vals = []
+    msg: Msg | None = None
+    for line_num, header, sig_block, val in tokenize(content):
+      if header:
+        header_msg = parse_message(header)
+        if header_msg is not None:
+          msg = header_msg
+          self.msgs[msg.address] = msg
+          self.addr_to_msg[msg.address] = msg
+          self.name_to_msg[msg.name] = msg
+      if header or sig_block:
+        # signals of an invalid header, or separated from theirs, go to the most recent message
+        if msg is not None and sig_block:
+          msg.sigs.update(parse_signals(sig_block, line_num + 1, self.name, checksum_state))
+      else:
+        parsed_val = parse_val(val)
+        if parsed_val is not None:
+          self._vals.append(parsed_val)
+
+  def _index(self, content: str):
+    """Lazy loading: only parse BO_ headers, each message's SG_ lines are parsed on first access to its signals"""
+    checksum_state = get_checksum_state(self.name)
+    self.msgs = {}
+    self.addr_to_msg = {}
+    self.name_to_msg = {}
+    self._vals = []
+    val_defs = []
+    sig_blocks: list[tuple[str, int]] | None = None  # SG_ blocks of the most recent message
+    for line_num, header, sig_block, val in tokenize(content):
+      if header:
+        header_msg = parse_message(header)
+        if header_msg is not None:
+          msg = LazyMsg(header_msg.name, header_msg.address, header_msg.size)
+          sig_blocks = []
+          msg.set_loader(self._signal_loader(sig_blocks, checksum_state))
+          self.msgs[msg.address] = msg
+          self.addr_to_msg[msg.address] = msg
+          self.name_to_msg[msg.name] = msg
+      if header or sig_block:
+        if sig_blocks is not None and sig_block:
+          sig_blocks.append((sig_block, line_num + 1))
+      else:
+        val_defs.append(val)
+    self._val_loader = lambda: [val for val in map(parse_val, val_defs) if val is not None]
+
+  def _signal_loader(self, sig_blocks: list[tuple[str, int]], checksum_state: 'ChecksumState | None') -> Callable[[], dict[str, Signal]]:
+    def load() -> dict[str, Signal]:
+      sigs = {}
+      for sig_block, line_num in sig_blocks:
+        sigs.update(parse_signals(sig_block, line_num, self.name, checksum_state))
+      return sigs
+    return load
+
+  @property
+  def vals(self) -> list[Val]:
+    if self._val_loader is not None:
+      self._vals.extend(self._val_loader())
+      self._val_loader = None
+    return self._vals
+
+  @property
+  def nbytes(self) -> int:
+    """Estimated size of the Python objects built so far, messages of lazy DBCs only count once their signals are loaded"""
+    nbytes = 0
+    for msg in self.msgs.values():
+      nbytes += MSG_BYTES
+      if not isinstance(msg, LazyMsg) or msg.loaded:
+        nbytes += SIGNAL_BYTES * len(msg.sigs)
+    if self._val_loader is None:
+      nbytes += sum(VAL_BYTES + len(val.def_val) for val in self._vals)
+    return nbytes
+
+
+class DBCRegistry:
+  """Holds loaded DBCs, evicting the least recently used once their estimated size exceeds max_bytes"""
+  def __init__(self, max_bytes: int):
+    self.max_bytes = max_bytes
+    self._dbcs: OrderedDict[tuple[str, bool | None], DBC] = OrderedDict()
+    self._sizes: dict[tuple[str, bool | None], int] = {}  # size of each DBC as of its last access
+    self._nbytes = 0
+    self._lock = threading.Lock()
+
+  def get(self, name: str, lazy: bool | None = None) -> DBC:
+    key = (name, lazy)
+    with self._lock:
+      dbc = self._dbcs.get(key)
+    if dbc is None:
+      # load outside the lock, racing loads of the same DBC are harmless
+      dbc = DBC(name, lazy)
+
+    with self._lock:
+      dbc = self._dbcs.setdefault(key, dbc)
+      self._dbcs.move_to_end(key)
+      # lazy DBCs grow as their messages are used, so the accessed one is measured again
+      nbytes = dbc.nbytes
+      self._nbytes += nbytes - self._sizes.get(key, 0)
+      self._sizes[key] = nbytes
+      self._evict()
+    return dbc
+
+  def _evict(self) -> None:
+    # the most recently used DBC is always kept, even if it's over budget by itself
+    while self._nbytes > self.max_bytes and len(self._dbcs) > 1:
+      key, _ = self._dbcs.popitem(last=False)
+      self._nbytes -= self._sizes.pop(key)
+
+  @property
+  def nbytes(self) -> int:
+    return self._nbytes
+
+  def __contains__(self, key: tuple[str, bool | None]) -> bool:
+    return key in self._dbcs
+
+  def __len__(self) -> int:
+    return len(self._dbcs)
+
+  def clear(self) -> None:
+    with self._lock:
+      self._dbcs.clear()
+      self._sizes.clear()
+      self._nbytes = 0
+
+
+DBC_REGISTRY = DBCRegistry(DBC_REGISTRY_MAX_BYTES)
+
+
+def get_dbc(name: str, lazy: bool | None = None) -> DBC:
+  return DBC_REGISTRY.get(name, lazy)
+
+
+class LazyMsg(Msg):
+  """Msg whose signals are parsed from the DBC text the first time they're accessed"""
+  def __init__(self, name: str, address: int, size: int):
+    self._sigs: dict[str, Signal] | None = None
+    self._loader: Callable[[], dict[str, Signal]] | None = None
+    super().__init__(name, address, size, None)  # type: ignore[arg-type]
+
+  def set_loader(self, loader: Callable[[], dict[str, Signal]]) -> None:
+    self._loader = loader
+
+  @property
+  def loaded(self) -> bool:
+    return self._sigs is not None
+
+  @property  # type: ignore[override]
+  def sigs(self) -> dict[str, Signal]:
+    if self._sigs is None:
+      self._sigs = self._loader() if self._loader is not None else {}
+      self._loader = None
+    return self._sigs
+
+  @sigs.setter
+  def sigs(self, sigs: dict[str, Signal] | None) -> None:
+    self._sigs = sigs
+
+
+def tokenize(content: str) -> Iterator[tuple[int, str, str, str]]:
+  """
+  Yields (line number, BO_ header, SG_ block, VAL_ definition) for each message and value table, keywords stripped.
+  The SG_ block starts on the line after the header, SG_ lines that don't directly follow a header come with an
+  empty header, starting on the given line, and belong to the most recent message like in a line by line parse.
+  """
+  content = "\n" + content
+  line_num, pos = 0, 0
+  for m in TOKENS_RE.finditer(content):
+    line_num += content.count("\n", pos, m.start() + 1)
+    pos = m.start() + 1
+    header, sig_block, stray_sigs, val = m.groups()
+    if stray_sigs:
+      yield line_num - 1, "", "\n" + stray_sigs, ""
+    else:
+      yield line_num, header or "", sig_block or "", val or ""
+
+
+def parse_message(header: str) -> Msg | None:
+  # <address> <name>: <size> <transmitter>
+  name_part, _, size_part = header.partition(":")
+  name_fields = name_part.split()
+  size_fields = size_part.split()
+  if len(name_fields) != 2 or len(size_fields) != 2:
+    return None
+  try:
+    return Msg(name_fields[1], int(name_fields[0], 0), int(size_fields[0], 0), {})
+  except ValueError:
+    return None
+
+
+def parse_signals(sig_block: str, line_num: int, dbc_name: str, checksum_state: 'ChecksumState | None') -> dict[str, Signal]:
+  """Tokenizes a message's block of SG_ lines, each prefixed by a newline, starting at line_num"""
+  # SG_ <name> [<multiplexer>] : <start bit>|<size>@<endianness><sign> (<factor>,<offset>) [<min>|<max>] "<unit>" <receivers>
+  sigs = {}
+  tokens = SG_TOKENS_RE.findall(sig_block)
+  for i, (sig_name, mux_indicator, start_bit_str, size_str, byte_order, sign, factor, offset) in enumerate(tokens):
+    if not sig_name:
+      continue
+    start_bit = int(start_bit_str)
+    size = int(size_str)
+    is_little_endian = byte_order == "1"
+
+    if is_little_endian:
+      lsb = start_bit
+      msb = start_bit + size - 1
+    else:
+      # walk size - 1 bits in big endian bit order: down within a byte, then to bit 7 of the next byte
+      pos = (start_bit // 8) * 8 + (7 - start_bit % 8) + size - 1
+      lsb = (pos // 8) * 8 + (7 - pos % 8)
+      msb = start_bit
+
+    # M is the multiplexer, mN is present when it's N, and mNM is both (extended multiplexing)
+    multiplexer = mux_indicator.endswith("M")
+    multiplex_value = None
+    if mux_indicator.startswith("m") and mux_indicator[1:].rstrip("M").isdigit():
+      multiplex_value = int(mux_indicator[1:].rstrip("M"))
+
+    sig = Signal(sig_name, start_bit, msb, lsb, size, sign == "-", float(factor), float(offset), is_little_endian,
+                 multiplexer=multiplexer, multiplex_value=multiplex_value)
+    set_signal_type(sig, checksum_state, dbc_name, line_num + i)
+    sigs[sig_name] = sig
+  return sigs
+
+
+def parse_val(definition: str) -> Val | None:
+  # <address> <signal> <value> "<description>" ... ;
+  fields = definition.split(None, 2)
+  if len(fields) != 3 or ";" not in fields[2]:
+    return None
+  defs = fields[2][:fields[2].rindex(";")]
+  try:
+    val_addr = int(fields[0], 0)
+  except ValueError:
+    return None
+  val_def = " ".join([w.upper().replace(" ", "_") for w in map(str.strip, defs.split('"')) if w])
+  return Val(fields[1], val_addr, val_def)
+
+
+def get_cache_key(dbc_name: str, content: bytes) -> str:
+  key = hashlib.sha256(content + f"{dbc_name}:{DBC_CACHE_VERSION}:{marshal.version}".encode()).hexdigest()[:32]
+  return f"{dbc_name}-{key}"
+
+
+def get_cache_path(dbc_name: str, content: bytes) -> str | None:
+  if not DBC_CACHE_DIR:
+    return None
+  return os.path.join(DBC_CACHE_DIR, get_cache_key(dbc_name, content) + ".bin")
 
 
 # ***** checksum functions *****
@@ -202,6 +550,32 @@ def get_checksum_state(dbc_name: str) -> ChecksumState | None:
   return None
 
 
+# checksum functions split into a per message context, which works out everything that only depends on the
+# address and signal once, and returns the payload-only function
+CHECKSUM_CONTEXTS: dict[Callable, Callable[[int, Signal], Callable[[bytes], int]]] = {
+  honda_checksum: honda_checksum_context,
+  toyota_checksum: toyota_checksum_context,
+  subaru_checksum: subaru_checksum_context,
+  fca_giorgio_checksum: fca_giorgio_checksum_context,
+  hkg_can_fd_checksum: hkg_can_fd_checksum_context,
+  volkswagen_mlb_checksum: volkswagen_mlb_checksum_context,
+  volkswagen_mqb_meb_checksum: volkswagen_mqb_meb_checksum_context,
+  xor_checksum: xor_checksum_context,
+  tesla_checksum: tesla_checksum_context,
+  psa_checksum: psa_checksum_context,
+}
+
+
+def get_checksum_context(address: int, sig: Signal) -> Callable[[bytes], int]:
+  """Payload-only checksum function of sig in the message at address. The payload isn't modified"""
+  calc_checksum = sig.calc_checksum
+  assert calc_checksum is not None
+  make_context = CHECKSUM_CONTEXTS.get(calc_checksum)
+  if make_context is not None:
+    return make_context(address, sig)
+  return lambda d: calc_checksum(address, sig, d)
+
+
 def set_signal_type(sig: Signal, chk: ChecksumState | None, dbc_name: str, line_num: int) -> None:
   sig.calc_checksum = None
   if chk:
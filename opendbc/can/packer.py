@@ -1,58 +1,226 @@
 import math
+from collections.abc import Callable
+from typing import NamedTuple
 
+from opendbc.car.can_definitions import CanData
 from opendbc.car.carlog import carlog
-from opendbc.can.dbc import DBC, Signal, SignalType
+from opendbc.can.dbc import Msg, Signal, SignalType, get_checksum_context, get_dbc
+
+# distinct sets of static values kept per packer
+MAX_STATIC_BASES = 256
+
+
+class PackPlan(NamedTuple):
+  sig: Signal
+  shift: int  # offset of the lsb in the payload read as one integer in the template's byte order, -1 if written with steps
+  clear: int  # ~(mask << shift)
+  mask: int
+  steps: tuple[tuple[int, int, int, int], ...]  # (byte, shift, size, keep mask) writes into the packed bytes
+  factor: float
+  offset: float
+
+
+def compile_steps(sig: Signal, dat_len: int) -> tuple[tuple[int, int, int, int], ...]:
+  # the byte writes set_value does for this signal, worked out once
+  steps = []
+  i = sig.lsb // 8
+  bits = sig.size
+  while 0 <= i < dat_len and bits > 0:
+    shift = sig.lsb % 8 if (sig.lsb // 8) == i else 0
+    size = min(bits, 8 - shift)
+    steps.append((i, shift, size, 0xFF & ~(((1 << size) - 1) << shift)))
+    bits -= size
+    i = i + 1 if sig.is_little_endian else i - 1
+  return tuple(steps)
+
+
+def compile_pack_signal(sig: Signal, dat_len: int, little_endian: bool) -> PackPlan:
+  shift = -1
+  if sig.is_little_endian == little_endian and sig.lsb // 8 < dat_len:
+    # bits past either end of the payload are dropped when the integer is converted to bytes
+    shift = sig.lsb if little_endian else (dat_len - 1 - sig.lsb // 8) * 8 + sig.lsb % 8
+  mask = (1 << sig.size) - 1
+  return PackPlan(sig, shift, ~(mask << max(shift, 0)), mask, compile_steps(sig, dat_len), sig.factor, sig.offset)
+
+
+def write_steps(dat: bytearray, steps: tuple[tuple[int, int, int, int], ...], ival: int) -> None:
+  for i, shift, size, keep in steps:
+    dat[i] = (dat[i] & keep) | ((ival & ((1 << size) - 1)) << shift)
+    ival >>= size
+
+
+class MessageTemplate:
+  """
+  Packing template for one message, compiled on first use. The payload is built as one integer in the
+  byte order most of the message's signals use, so each signal is a single masked write; signals in the
+  other byte order and the checksum are written into the bytes afterwards.
+  """
+  __slots__ = ('address', 'name', 'size', 'byteorder', 'full_mask', 'plans', 'counter', 'checksum', 'calc_checksum', 'scratch')
+
+  def __init__(self, msg: Msg):
+    sigs = list(msg.sigs.values())
+    little_endian = 2 * sum(s.is_little_endian for s in sigs) >= len(sigs)
+    self.address = msg.address
+    self.name = msg.name
+    self.size = msg.size
+    self.byteorder = 'little' if little_endian else 'big'
+    self.full_mask = (1 << (8 * msg.size)) - 1
+    self.plans = {s.name: compile_pack_signal(s, msg.size, little_endian) for s in sigs}
+
+    # signals written after the integer would overwrite overlapping ones regardless of the order they were
+    # given in, so such messages write every signal bytewise in order
+    def bits(plan: PackPlan) -> set[int]:
+      return {i * 8 + shift + b for i, shift, size, _ in plan.steps for b in range(size)}
+    late_bits = set().union(*(bits(p) for p in self.plans.values() if p.shift < 0))
+    if any(bits(p) & late_bits for p in self.plans.values() if p.shift >= 0):
+      self.plans = {name: p._replace(shift=-1) for name, p in self.plans.items()}
+
+    sig_counter = next((s for s in sigs if s.type == SignalType.COUNTER or s.name == "COUNTER"), None)
+    sig_checksum = next((s for s in sigs if s.type > SignalType.COUNTER), None)
+    self.counter = self.plans[sig_counter.name] if sig_counter else None
+    self.checksum: PackPlan | None = None
+    self.calc_checksum: Callable[[bytes], int] | None = None
+    if sig_checksum is not None and sig_checksum.calc_checksum is not None:
+      self.checksum = self.plans[sig_checksum.name]
+      self.calc_checksum = get_checksum_context(msg.address, sig_checksum)
+    self.scratch = bytearray(msg.size)
+
+
+class StaticBase(NamedTuple):
+  """A message packed with only its static values, patched with the changing values on each call"""
+  val: int
+  late: tuple[tuple[tuple[tuple[int, int, int, int], ...], int], ...]
+  counter: int | None  # counter value set by the static values
 
 
 class CANPacker:
   def __init__(self, dbc_name: str):
-    self.dbc = DBC(dbc_name)
+    self.dbc = get_dbc(dbc_name)
     self.counters: dict[int, int] = {}
+    self.templates: dict[int, MessageTemplate] = {}
+    self.static_bases: dict[tuple, StaticBase] = {}
+
+  def template(self, name_or_addr: str | int) -> MessageTemplate | None:
+    addr = name_or_addr
+    if not isinstance(name_or_addr, int):
+      msg = self.dbc.name_to_msg.get(name_or_addr)
+      if msg is None:
+        return None
+      addr = msg.address
+    tmpl = self.templates.get(addr)
+    if tmpl is None:
+      msg = self.dbc.addr_to_msg.get(addr)
+      if msg is None:
+        return None
+      tmpl = self.templates[addr] = MessageTemplate(msg)
+      if not isinstance(name_or_addr, int):
+        self.templates[name_or_addr] = tmpl
+    return tmpl
 
-  def pack(self, address: int, values: dict[str, float]) -> bytearray:
-    msg = self.dbc.addr_to_msg.get(address)
-    if msg is None:
+  def pack(self, address: int, values: dict[str, float], static: dict[str, float] | None = None) -> bytearray:
+    tmpl = self.template(address)
+    if tmpl is None:
       carlog.error(f"msg not found for {address=}")
       return bytearray()
-    dat = bytearray(msg.size)
-    counter_set = False
+    return self._pack(tmpl, values, None if static is None else self.static_base(tmpl, static))
+
+  def static_base(self, tmpl: MessageTemplate, static: dict[str, float]) -> StaticBase:
+    key = (tmpl.address, *static.items())
+    base = self.static_bases.get(key)
+    if base is None:
+      val, late, counter = self._place(tmpl, static, 0, [], None)
+      if len(self.static_bases) >= MAX_STATIC_BASES:
+        self.static_bases.clear()
+      base = self.static_bases[key] = StaticBase(val, tuple(late), counter)
+    return base
+
+  def _place(self, tmpl: MessageTemplate, values: dict[str, float], val: int, late: list, counter_value: int | None):
+    plans = tmpl.plans
+    counter = tmpl.counter
     for name, value in values.items():
-      sig = msg.sigs.get(name)
-      if sig is None:
-        carlog.error(f"unknown signal {name=} in {msg.name}")
+      plan = plans.get(name)
+      if plan is None:
+        carlog.error(f"unknown signal {name=} in {tmpl.name}")
         continue
-      ival = int(math.floor((value - sig.offset) / sig.factor + 0.5))
-      if ival < 0:
-        ival = (1 << sig.size) + ival
-      set_value(dat, sig, ival)
-      if sig.type == SignalType.COUNTER or sig.name == "COUNTER":
-        self.counters[address] = int(value)
-        counter_set = True
-    sig_counter = next((s for s in msg.sigs.values() if s.type == SignalType.COUNTER or s.name == "COUNTER"), None)
-    if sig_counter and not counter_set:
-      if address not in self.counters:
-        self.counters[address] = 0
-      set_value(dat, sig_counter, self.counters[address])
-      self.counters[address] = (self.counters[address] + 1) % (1 << sig_counter.size)
-    sig_checksum = next((s for s in msg.sigs.values() if s.type > SignalType.COUNTER), None)
-    if sig_checksum and sig_checksum.calc_checksum:
-      checksum = sig_checksum.calc_checksum(address, sig_checksum, dat)
-      set_value(dat, sig_checksum, checksum)
-    return dat
+      ival = int(math.floor((value - plan.offset) / plan.factor + 0.5)) & plan.mask
+      if plan.shift >= 0:
+        val = (val & plan.clear) | (ival << plan.shift)
+      else:
+        late.append((plan.steps, ival))
+      if plan is counter:
+        counter_value = int(value)
+    return val, late, counter_value
 
-  def make_can_msg(self, name_or_addr, bus: int, values: dict[str, float]):
-    if isinstance(name_or_addr, int):
-      addr = name_or_addr
+  def _pack(self, tmpl: MessageTemplate, values: dict[str, float], base: StaticBase | None = None,
+            scratch: bytearray | None = None) -> bytearray | bytes:
+    """Pack into a new bytearray, or into scratch when given. Returns bytes when nothing is written after the integer is converted"""
+    if base is None:
+      val, late, counter_value = self._place(tmpl, values, 0, [], None)
     else:
-      msg = self.dbc.name_to_msg.get(name_or_addr)
-      if msg is None:
-        carlog.error(f"msg not found for {name_or_addr=}")
-        return 0, b'', bus
-      addr = msg.address
-    dat = self.pack(addr, values)
-    if len(dat) == 0:
+      val, late, counter_value = self._place(tmpl, values, base.val, list(base.late), base.counter)
+
+    counter = tmpl.counter
+    if counter is not None:
+      if counter_value is not None:
+        self.counters[tmpl.address] = counter_value
+      else:
+        cnt = self.counters.get(tmpl.address, 0) & counter.mask
+        if counter.shift >= 0:
+          val = (val & counter.clear) | (cnt << counter.shift)
+        else:
+          late.append((counter.steps, cnt))
+        self.counters[tmpl.address] = (cnt + 1) % (1 << counter.sig.size)
+
+    packed = (val & tmpl.full_mask).to_bytes(tmpl.size, tmpl.byteorder)
+    checksum = tmpl.checksum
+    calc_checksum = tmpl.calc_checksum
+    if scratch is not None:
+      if not late and checksum is None:
+        return packed
+      scratch[:] = packed
+      dat = scratch
+    else:
+      dat = bytearray(packed)
+    for steps, ival in late:
+      write_steps(dat, steps, ival)
+
+    if checksum is not None and calc_checksum is not None:
+      write_steps(dat, checksum.steps, calc_checksum(dat))
+    return dat
+
+  def make_can_msg(self, name_or_addr, bus: int, values: dict[str, float], static: dict[str, float] | None = None):
+    """
+    Pack a message. Values that are the same every frame can be passed as static, the message is then
+    packed with them once and only values, the counter and the checksum are written on each call.
+    """
+    tmpl = self.templates.get(name_or_addr) or self.template(name_or_addr)
+    if tmpl is None:
+      carlog.error(f"msg not found for {name_or_addr=}")
+      return 0, b'', bus
+    if tmpl.size == 0:
       return 0, b'', bus
-    return addr, bytes(dat), bus
+    dat = self._pack(tmpl, values, None if static is None else self.static_base(tmpl, static), tmpl.scratch)
+    return tmpl.address, bytes(dat), bus
+
+  def make_can_msgs(self, msgs: list[tuple]) -> list[CanData]:
+    """
+    Pack a list of (name_or_addr, bus, values) or (name_or_addr, bus, values, static) in one call,
+    in order. Messages that can't be packed are returned as (0, b'', bus) like make_can_msg does.
+    """
+    templates = self.templates
+    ret = []
+    for m in msgs:
+      tmpl = templates.get(m[0]) or self.template(m[0])
+      if tmpl is None:
+        carlog.error(f"msg not found for name_or_addr={m[0]!r}")
+        ret.append(CanData(0, b'', m[1]))
+        continue
+      if tmpl.size == 0:
+        ret.append(CanData(0, b'', m[1]))
+        continue
+      base = self.static_base(tmpl, m[3]) if len(m) > 3 and m[3] is not None else None
+      ret.append(CanData(tmpl.address, bytes(self._pack(tmpl, m[2], base, tmpl.scratch)), m[1]))
+    return ret
 
 
 def set_value(msg: bytearray, sig: Signal, ival: int) -> None:
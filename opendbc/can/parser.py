@@ -1,14 +1,29 @@
+import copy
+import heapq
 import math
 import numbers
-from collections import defaultdict, deque
+import struct
+from array import array
+from collections import defaultdict
+from collections.abc import Callable, Mapping, Sequence
 from dataclasses import dataclass, field
+from typing import NamedTuple
+
+import numpy as np
 
 from opendbc.car.carlog import carlog
-from opendbc.can.dbc import DBC, Signal
+from opendbc.can.batch import MAX_BAD_COUNTER, BatchResult, decode_batch
+from opendbc.can.dbc import DBC, Signal, SignalType, get_checksum_context, get_dbc
 
 
-MAX_BAD_COUNTER = 5
 CAN_INVALID_CNT = 5
+HISTORY_CAPACITY = 16  # initial frames per update kept for vl_all, doubled when exceeded
+FREQUENCY_WINDOW = 500  # max frames used to learn a message's frequency
+
+# fixed-layout frame record for CANParser.update_packed:
+# address (u32), bus (u8), length (u8), 2 pad bytes, payload (64 bytes), timestamp in nanoseconds (u64)
+PACKED_RECORD = struct.Struct("<IBBxx64xQ")
+PACKED_PAYLOAD_OFFSET = 8
 
 
 def get_raw_value(dat: bytes | bytearray, sig: Signal) -> int:
@@ -26,7 +41,67 @@ def get_raw_value(dat: bytes | bytearray, sig: Signal) -> int:
   return ret
 
 
-@dataclass
+class SignalPlan(NamedTuple):
+  idx: int  # index into MessageState.signals
+  sig: Signal
+  little_endian: bool
+  shift: int  # offset of the lsb in the payload read as one integer, -1 if the signal doesn't fit the payload
+  mask: int
+  sign_bit: int  # 0 for unsigned signals
+  sign_sub: int
+  factor: float
+  offset: float
+
+
+def compile_signal(sig: Signal, dat_len: int, idx: int = 0) -> SignalPlan:
+  # the payload is read as a single integer in the signal's byte order, so extraction is one shift and mask
+  if sig.is_little_endian:
+    shift = sig.lsb if sig.msb // 8 < dat_len else -1
+  else:
+    shift = (dat_len - 1 - sig.lsb // 8) * 8 + sig.lsb % 8 if sig.lsb // 8 < dat_len else -1
+  sign_bit = (1 << (sig.size - 1)) if sig.is_signed else 0
+  return SignalPlan(idx, sig, sig.is_little_endian, shift, (1 << sig.size) - 1, sign_bit, 1 << sig.size, sig.factor, sig.offset)
+
+
+def pack_records(can_packets: list[tuple[int, list[tuple[int, bytes, int]]]]) -> bytearray:
+  """Serialize (nanos, [(address, dat, src), ...]) entries into the PACKED_RECORD layout"""
+  frames = [(t, f) for t, msgs in can_packets for f in msgs]
+  buf = bytearray(PACKED_RECORD.size * len(frames))
+  for i, (t, (address, dat, src)) in enumerate(frames):
+    off = i * PACKED_RECORD.size
+    PACKED_RECORD.pack_into(buf, off, address, src, len(dat), t)
+    buf[off + PACKED_PAYLOAD_OFFSET:off + PACKED_PAYLOAD_OFFSET + len(dat)] = dat
+  return buf
+
+
+FrameBuckets = list[tuple[int, dict[int, dict[int, list[bytes]]]]]
+
+
+def bucket_frames(strings) -> FrameBuckets:
+  """
+  Group the frames of each (nanos, frames) entry by bus and address in one pass, so several
+  CANParsers can be updated from the same packets without each scanning every frame.
+  """
+  if strings and not isinstance(strings[0], list | tuple):
+    strings = [strings]
+
+  buckets: FrameBuckets = []
+  for entry in strings:
+    buses: dict[int, dict[int, list[bytes]]] = {}
+    for address, dat, src in entry[1]:
+      by_addr = buses.get(src)
+      if by_addr is None:
+        by_addr = buses[src] = {}
+      dats = by_addr.get(address)
+      if dats is None:
+        by_addr[address] = [dat]
+      else:
+        dats.append(dat)
+    buckets.append((entry[0], buses))
+  return buckets
+
+
+@dataclass(slots=True)
 class MessageState:
   address: int
   name: str
@@ -38,8 +113,33 @@ class MessageState:
   frequency: float = 0.0
   timeout_threshold: float = 1e5  # default to 1Hz threshold
   vals: list[float] = field(default_factory=list)
-  all_vals: list[list[float]] = field(default_factory=list)
-  timestamps: deque[int] = field(default_factory=lambda: deque(maxlen=500))
+  scratch: list[float] = field(default_factory=list)
+  # values of every frame accepted since the last update, one row of len(signals) per frame
+  history: array = field(default_factory=lambda: array('d'))
+  history_len: int = 0
+  # frequency estimation: first timestamp and number of valid frames in the current window
+  window_start_nanos: int = 0
+  window_count: int = 0
+  last_nanos: int = 0  # timestamp of the last valid frame
+  seen: bool = False
+  plans: dict[int, list[SignalPlan]] = field(default_factory=dict)
+  check_plans: dict[int, list[SignalPlan]] = field(default_factory=dict)
+  checksums: dict[int, Callable[[bytes], int]] = field(default_factory=dict)  # payload-only checksum function per signal index
+  # the checksum verdict only depends on the payload, so it's kept for the last payload checked
+  checksum_dat: bytes | None = None
+  checksum_failed: bool = False
+  # multiplexed messages: index of the multiplexer signal, and per payload length the plan for each multiplexer
+  # value, which only holds the signals present for that value. -1 when the message isn't multiplexed
+  mux: int = -1
+  mux_plans: dict[int, dict[int | None, list[SignalPlan]]] = field(default_factory=dict)
+  active: list[SignalPlan] = field(default_factory=list)  # signals of the last valid frame, multiplexed messages only
+  mux_latest: dict[int, tuple[bytes, int]] = field(default_factory=dict)  # latest payload and time per multiplexer value, lazy mode only
+  lazy: bool = False
+  dat: bytes = b""  # latest valid payload, lazy mode only
+  dats: list[bytes] = field(default_factory=list)  # valid payloads since the last update, lazy mode only
+  deadline: float = 0.0  # last valid frame + timeout_threshold
+  queued_deadline: float = 0.0  # deadline of this message's live entry in the tracker heap
+  tracker: 'ValidityTracker | None' = field(default=None, repr=False, compare=False)
   counter: int = 0
   counter_fail: int = 0
   first_seen_nanos: int = 0
@@ -50,21 +150,103 @@ class MessageState:
       carlog.warning(f"CANParser: {hex(self.address)} {self.name} {msg}")
       self.last_warning_log_nanos = last_update_nanos
 
+  def compile(self, dat_len: int) -> list[SignalPlan]:
+    plan = [compile_signal(sig, dat_len, i) for i, sig in enumerate(self.signals)]
+    self.plans[dat_len] = plan
+    self.check_plans[dat_len] = [sp for sp in plan if sp.sig.calc_checksum is not None or sp.sig.type == SignalType.COUNTER]
+    for sp in plan:
+      if sp.sig.calc_checksum is not None and sp.idx not in self.checksums:
+        self.checksums[sp.idx] = get_checksum_context(self.address, sp.sig)
+
+    mux_values = {sig.multiplex_value for sig in self.signals if sig.multiplex_value is not None}
+    self.mux = next((i for i, sig in enumerate(self.signals) if sig.multiplexer and sig.multiplex_value is None), -1) if mux_values else -1
+    if self.mux >= 0:
+      self.mux_plans[dat_len] = {v: [sp for sp in plan if sp.sig.multiplex_value in (None, v)] for v in (None, *mux_values)}
+    return plan
+
+  def raw(self, dat: bytes, i: int) -> int:
+    plan = self.plans.get(len(dat))
+    if plan is None:
+      plan = self.compile(len(dat))
+    _, sig, little_endian, shift, mask, sign_bit, sign_sub, _, _ = plan[i]
+    if shift >= 0:
+      tmp = (int.from_bytes(dat, "little" if little_endian else "big") >> shift) & mask
+    else:
+      tmp = get_raw_value(dat, sig)
+    if tmp & sign_bit:
+      tmp -= sign_sub
+    return tmp
+
+  def decode(self, dat: bytes, i: int) -> float:
+    sig = self.signals[i]
+    return self.raw(dat, i) * sig.factor + sig.offset
+
+  def carries(self, dat: bytes, i: int) -> bool:
+    """Whether signal i is present in this frame, i.e. it isn't multiplexed or the multiplexer selects it"""
+    mux_value = self.signals[i].multiplex_value
+    return self.mux < 0 or mux_value is None or self.raw(dat, self.mux) == mux_value
+
+  def latest(self, i: int) -> tuple[bytes, int] | None:
+    """Payload and time of the last valid frame that carried signal i, lazy mode only"""
+    mux_value = self.signals[i].multiplex_value
+    if self.mux < 0 or mux_value is None:
+      return self.dat, self.last_nanos
+    return self.mux_latest.get(mux_value)
+
   def parse(self, nanos: int, dat: bytes) -> bool:
-    tmp_vals: list[float] = [0.0] * len(self.signals)
     checksum_failed = False
     counter_failed = False
 
     if self.first_seen_nanos == 0:
       self.first_seen_nanos = nanos
 
-    for i, sig in enumerate(self.signals):
-      tmp = get_raw_value(dat, sig)
-      if sig.is_signed:
-        tmp -= ((tmp >> (sig.size - 1)) & 0x1) * (1 << sig.size)
+    plan = self.plans.get(len(dat))
+    if plan is None:
+      plan = self.compile(len(dat))
+    mux_value = None
+    if self.mux >= 0:
+      # only decode the signals present for this multiplexer value
+      mux_value = self.raw(dat, self.mux)
+      mux_plans = self.mux_plans[len(dat)]
+      plan = mux_plans.get(mux_value, mux_plans[None])
+
+    store = not self.lazy
+    if store:
+      # decoded values go to the next history row, which only becomes visible once the frame is accepted
+      n_sigs = len(self.signals)
+      base = self.history_len * n_sigs
+      if base + n_sigs > len(self.history):
+        self.history.extend(array('d', bytes(8 * max(len(self.history), HISTORY_CAPACITY * n_sigs))))
+      history = self.history
+      scratch = self.scratch
+      if mux_value is not None:
+        # signals absent from this frame keep their values, and are left out of its history row
+        scratch[:] = self.vals
+        history[base:base + n_sigs] = array('d', [math.nan]) * n_sigs
+    else:
+      # only counter and checksum are decoded up front, the rest on first read
+      plan = self.check_plans[len(dat)]
+
+    check_checksum = not self.ignore_checksum and bool(self.checksums)
+    if check_checksum and dat == self.checksum_dat:
+      # same payload as the last frame, e.g. a static status message
+      check_checksum = False
+      checksum_failed = self.checksum_failed
+      if checksum_failed:
+        self.rate_limited_log(nanos, "checksum failed")
+
+    le = int.from_bytes(dat, "little")
+    be = int.from_bytes(dat, "big")
+    for i, sig, little_endian, shift, mask, sign_bit, sign_sub, factor, offset in plan:
+      if shift >= 0:
+        tmp = ((le if little_endian else be) >> shift) & mask
+      else:
+        tmp = get_raw_value(dat, sig)
+      if tmp & sign_bit:
+        tmp -= sign_sub
 
-      if not self.ignore_checksum and sig.calc_checksum is not None:
-        expected_checksum = sig.calc_checksum(self.address, sig, bytearray(dat))
+      if check_checksum and sig.calc_checksum is not None:
+        expected_checksum = self.checksums[i](dat)
         if tmp != expected_checksum:
           checksum_failed = True
           self.rate_limited_log(nanos, f"checksum failed: received {hex(tmp)}, calculated {hex(expected_checksum)}")
@@ -73,47 +255,260 @@ class MessageState:
         if not self.update_counter(tmp, sig.size):
           counter_failed = True
 
-      tmp_vals[i] = tmp * sig.factor + sig.offset
+      if store:
+        v = tmp * factor + offset
+        scratch[i] = v
+        history[base + i] = v
+
+    if check_checksum:
+      self.checksum_dat = dat if type(dat) is bytes else bytes(dat)
+      self.checksum_failed = checksum_failed
 
     # must have good counter and checksum to update data
     if checksum_failed or counter_failed:
       return False
 
-    if not self.vals:
-      self.vals = [0.0] * len(self.signals)
-      self.all_vals = [[] for _ in self.signals]
-
-    for i, v in enumerate(tmp_vals):
-      self.vals[i] = v
-      self.all_vals[i].append(v)
-
-    self.timestamps.append(nanos)
-
-    if self.frequency < 1e-5 and len(self.timestamps) >= 3:
-      dt = (self.timestamps[-1] - self.timestamps[0]) * 1e-9
-      if (dt > 1.0 or (self.timestamps.maxlen is not None and len(self.timestamps) >= self.timestamps.maxlen)) and dt != 0:
-        self.frequency = min(len(self.timestamps) / dt, 100.0)
-        self.timeout_threshold = (1_000_000_000 / self.frequency) * 10
+    if self.lazy:
+      self.dat = bytes(dat)
+      self.dats.append(self.dat)
+      if mux_value is not None:
+        self.mux_latest[mux_value] = (self.dat, nanos)
+    else:
+      self.vals, self.scratch = self.scratch, self.vals
+      self.history_len += 1
+      if mux_value is not None:
+        self.active = plan
+
+    self.last_nanos = nanos
+    self.deadline = nanos + self.timeout_threshold
+    if not self.seen:
+      self.seen = True
+      if self.tracker is not None:
+        self.tracker.seen(self)
+
+    if self.frequency < 1e-5:
+      self.update_frequency(nanos)
     return True
 
+  def update_frequency(self, nanos: int) -> None:
+    if self.window_count == 0:
+      self.window_start_nanos = nanos
+    self.window_count += 1
+    if self.window_count < 3:
+      return
+
+    dt = (nanos - self.window_start_nanos) * 1e-9
+    if dt == 0:
+      if self.window_count >= FREQUENCY_WINDOW:
+        # no time has passed over a full window, start over
+        self.window_count = 0
+      return
+
+    if dt > 1.0 or self.window_count >= FREQUENCY_WINDOW:
+      self.frequency = min(self.window_count / dt, 100.0)
+      self.timeout_threshold = (1_000_000_000 / self.frequency) * 10
+      self.deadline = nanos + self.timeout_threshold
+      if self.tracker is not None:
+        self.tracker.threshold_changed(self)
+
   def update_counter(self, cur_count: int, cnt_size: int) -> bool:
+    was_valid = self.counter_fail < MAX_BAD_COUNTER
     if ((self.counter + 1) & ((1 << cnt_size) - 1)) != cur_count:
       self.counter_fail = min(self.counter_fail + 1, MAX_BAD_COUNTER)
     elif self.counter_fail > 0:
       self.counter_fail -= 1
     self.counter = cur_count
-    return self.counter_fail < MAX_BAD_COUNTER
+    valid = self.counter_fail < MAX_BAD_COUNTER
+    if valid != was_valid and self.tracker is not None:
+      self.tracker.counter_changed(self)
+    return valid
 
   def valid(self, current_nanos: int, bus_timeout: bool) -> bool:
     if self.ignore_alive:
       return True
-    if not self.timestamps:
+    if not self.seen:
       return False
-    if (current_nanos - self.timestamps[-1]) > self.timeout_threshold:
+    if (current_nanos - self.last_nanos) > self.timeout_threshold:
       return False
     return True
 
 
+class ValidityTracker:
+  """
+  Incrementally maintained validity of a parser's messages, so can_valid and bus_timeout don't scan every message.
+  Timeouts use a lazy min-heap of deadlines: entries are only refreshed when they reach the top.
+  """
+  def __init__(self, states: dict[int, MessageState]):
+    self.states = states
+    self.alive_count = 0  # messages checked for timeouts
+    self.unseen: set[int] = set()
+    self.counters_invalid: set[int] = set()
+    self.deadlines: list[tuple[float, int]] = []
+    self._bus_timeout_threshold: float | None = None
+
+  def add(self, state: MessageState) -> None:
+    state.tracker = self
+    if not state.ignore_alive:
+      self.alive_count += 1
+      self.unseen.add(state.address)
+    self._bus_timeout_threshold = None
+
+  def _push(self, state: MessageState) -> None:
+    state.queued_deadline = state.deadline
+    heapq.heappush(self.deadlines, (state.deadline, state.address))
+
+  def seen(self, state: MessageState) -> None:
+    if not state.ignore_alive:
+      self.unseen.discard(state.address)
+      self._push(state)
+
+  def threshold_changed(self, state: MessageState) -> None:
+    self._bus_timeout_threshold = None
+    if not state.ignore_alive:
+      # the deadline may have moved earlier than the queued one
+      self._push(state)
+
+  def counter_changed(self, state: MessageState) -> None:
+    if state.counter_fail >= MAX_BAD_COUNTER:
+      self.counters_invalid.add(state.address)
+    else:
+      self.counters_invalid.discard(state.address)
+
+  @property
+  def bus_timeout_threshold(self) -> float:
+    if self._bus_timeout_threshold is None:
+      self._bus_timeout_threshold = min([500 * 1_000_000] + [st.timeout_threshold for st in self.states.values() if st.timeout_threshold > 0])
+    return self._bus_timeout_threshold
+
+  def timed_out(self, current_nanos: int) -> bool:
+    heap = self.deadlines
+    while heap:
+      deadline, address = heap[0]
+      state = self.states[address]
+      if deadline != state.queued_deadline:
+        # superseded entry
+        heapq.heappop(heap)
+      elif deadline < state.deadline:
+        # message was received since this entry was queued
+        state.queued_deadline = state.deadline
+        heapq.heapreplace(heap, (state.deadline, address))
+      else:
+        return not state.valid(current_nanos, False)
+    return False
+
+  def all_valid(self, current_nanos: int) -> bool:
+    return not self.unseen and not self.timed_out(current_nanos)
+
+
+class SignalHistory(Sequence):
+  """Values of one signal accepted since the last update, a read-only view of the message's history buffer"""
+  __slots__ = ("state", "idx")
+
+  def __init__(self, state: MessageState, idx: int):
+    self.state = state
+    self.idx = idx
+
+  def __len__(self) -> int:
+    return self.state.history_len
+
+  def __getitem__(self, i):
+    if isinstance(i, slice):
+      return [self[j] for j in range(*i.indices(len(self)))]
+    n = self.state.history_len
+    if i < 0:
+      i += n
+    if not 0 <= i < n:
+      raise IndexError("signal history index out of range")
+    return self.state.history[i * len(self.state.signals) + self.idx]
+
+  def __iter__(self):
+    n_sigs = len(self.state.signals)
+    return iter(self.state.history[self.idx:self.state.history_len * n_sigs:n_sigs])
+
+  def __eq__(self, other):
+    if isinstance(other, Sequence) and not isinstance(other, str | bytes):
+      return list(self) == list(other)
+    return NotImplemented
+
+  __hash__ = None  # type: ignore[assignment]
+
+  def __copy__(self) -> list[float]:
+    return list(self)
+
+  def __deepcopy__(self, memo) -> list[float]:
+    return list(self)
+
+  def __repr__(self) -> str:
+    return repr(list(self))
+
+
+class MultiplexedSignalHistory(SignalHistory):
+  """History of a multiplexed signal, which only has values for the frames that carried it"""
+  __slots__ = ()
+
+  def __len__(self) -> int:
+    return sum(1 for _ in self)
+
+  def __getitem__(self, i):
+    return list(self)[i]
+
+  def __iter__(self):
+    return (v for v in super().__iter__() if not math.isnan(v))
+
+
+class LazySignalDict(Mapping):
+  """
+  Per-message signal mapping for lazy parsing. After invalidate(), each value is recomputed by
+  decode(name) the first time it's read. It isn't a dict subclass, so every read path, including
+  dict(), ** unpacking and iteration, goes through __getitem__.
+  """
+  def __init__(self, values: dict, decode):
+    self.data = dict(values)
+    self.decode = decode
+    self.fresh: set[str] | None = None  # None when every value is up to date
+
+  def invalidate(self) -> None:
+    self.fresh = set()
+
+  def _refresh(self, key) -> None:
+    if self.fresh is not None and key not in self.fresh and key in self.data:
+      self.data[key] = self.decode(key)
+      self.fresh.add(key)
+
+  def materialize(self) -> None:
+    if self.fresh is not None:
+      for key in self.data:
+        self._refresh(key)
+      self.fresh = None
+
+  def __getitem__(self, key):
+    self._refresh(key)
+    return self.data[key]
+
+  def __iter__(self):
+    return iter(self.data)
+
+  def __len__(self) -> int:
+    return len(self.data)
+
+  def __contains__(self, key) -> bool:
+    return key in self.data
+
+  def copy(self) -> dict:
+    self.materialize()
+    return dict(self.data)
+
+  __copy__ = copy
+
+  def __deepcopy__(self, memo) -> dict:
+    self.materialize()
+    return copy.deepcopy(self.data, memo)
+
+  def __repr__(self) -> str:
+    self.materialize()
+    return repr(self.data)
+
+
 class VLDict(dict):
   def __init__(self, parser):
     super().__init__()
@@ -126,18 +521,22 @@ class VLDict(dict):
 
 
 class CANParser:
-  def __init__(self, dbc_name: str, messages: list[tuple[str | int, int]], bus: int):
+  def __init__(self, dbc_name: str, messages: list[tuple[str | int, int] | tuple[str | int, int, list[str]]], bus: int, lazy: bool = False):
     self.dbc_name: str = dbc_name
     self.bus: int = bus
-    self.dbc: DBC = DBC(dbc_name)
+    # lazy: validate counters and checksums per frame, but only decode other signals when read from vl/vl_all
+    self.lazy: bool = lazy
+    self.dbc: DBC = get_dbc(dbc_name)
 
     self.vl: dict[int | str, dict[str, float]] = VLDict(self)
     self.vl_all: dict[int | str, dict[str, list[float]]] = {}
     self.ts_nanos: dict[int | str, dict[str, int]] = {}
     self.addresses: set[int] = set()
     self.message_states: dict[int, MessageState] = {}
+    self.tracker = ValidityTracker(self.message_states)
 
-    for name_or_addr, freq in messages:
+    # each entry is (name_or_addr, freq), or (name_or_addr, freq, signals) to only decode those signals
+    for name_or_addr, freq, *signals in messages:
       if isinstance(name_or_addr, numbers.Number):
         msg = self.dbc.addr_to_msg.get(int(name_or_addr))
       else:
@@ -146,14 +545,18 @@ class CANParser:
         raise RuntimeError(f"could not find message {name_or_addr!r} in DBC {dbc_name}")
       if msg.address in self.addresses:
         raise RuntimeError("Duplicate Message Check: %d" % msg.address)
+      if signals:
+        unknown = set(signals[0]) - msg.sigs.keys()
+        if unknown:
+          raise RuntimeError(f"could not find signals {sorted(unknown)} in message {msg.name} of DBC {dbc_name}")
 
-      self._add_message(name_or_addr, freq)
+      self._add_message(name_or_addr, freq, signals[0] if signals else None)
 
     self.can_invalid_cnt: int = CAN_INVALID_CNT
     self.last_nonempty_nanos: int = 0
     self._last_update_nanos: int = 0
 
-  def _add_message(self, name_or_addr: str | int, freq: int | None = None) -> None:
+  def _add_message(self, name_or_addr: str | int, freq: int | None = None, signals: list[str] | None = None) -> None:
     if isinstance(name_or_addr, numbers.Number):
       msg = self.dbc.addr_to_msg.get(int(name_or_addr))
     else:
@@ -162,22 +565,50 @@ class CANParser:
     assert msg.address not in self.addresses
 
     self.addresses.add(msg.address)
-    signal_names = list(msg.sigs.keys())
-    signals_dict = {s: 0.0 for s in signal_names}
-    dict.__setitem__(self.vl, msg.address, signals_dict)
-    dict.__setitem__(self.vl, msg.name, signals_dict)
-    self.vl_all[msg.address] = defaultdict(list)
-    self.vl_all[msg.name] = self.vl_all[msg.address]
-    self.ts_nanos[msg.address] = {s: 0 for s in signal_names}
-    self.ts_nanos[msg.name] = self.ts_nanos[msg.address]
+    sigs = list(msg.sigs.values())
+    if signals is not None:
+      # counter and checksum are always needed for validation, and the multiplexer to know which signals are present
+      sigs = [s for s in sigs if s.name in signals or s.calc_checksum is not None or s.type == SignalType.COUNTER or s.multiplexer]
+    signal_names = [s.name for s in sigs]
 
     state = MessageState(
       address=msg.address,
       name=msg.name,
       size=msg.size,
-      signals=list(msg.sigs.values()),
+      signals=sigs,
       ignore_alive=freq is not None and math.isnan(freq),
+      lazy=self.lazy,
     )
+    state.compile(msg.size)
+    state.vals = [0.0] * len(sigs)
+    state.scratch = [0.0] * len(sigs)
+
+    if self.lazy:
+      sig_idx = {s: i for i, s in enumerate(signal_names)}
+
+      def latest_value(s: str) -> float:
+        latest = state.latest(sig_idx[s])
+        return 0.0 if latest is None else state.decode(latest[0], sig_idx[s])
+
+      def latest_nanos(s: str) -> int:
+        latest = state.latest(sig_idx[s])
+        return 0 if latest is None else latest[1]
+
+      signals_dict = LazySignalDict({s: 0.0 for s in signal_names}, latest_value)
+      vl_all = LazySignalDict({s: [] for s in signal_names}, lambda s: [state.decode(d, sig_idx[s]) for d in state.dats if state.carries(d, sig_idx[s])])
+      ts_nanos = LazySignalDict({s: 0 for s in signal_names}, latest_nanos)
+    else:
+      signals_dict = {s: 0.0 for s in signal_names}
+      vl_all = {s.name: (MultiplexedSignalHistory if state.mux >= 0 and s.multiplex_value is not None else SignalHistory)(state, i)
+                for i, s in enumerate(sigs)}
+      ts_nanos = {s: 0 for s in signal_names}
+    dict.__setitem__(self.vl, msg.address, signals_dict)
+    dict.__setitem__(self.vl, msg.name, signals_dict)
+    self.vl_all[msg.address] = vl_all
+    self.vl_all[msg.name] = vl_all
+    self.ts_nanos[msg.address] = ts_nanos
+    self.ts_nanos[msg.name] = ts_nanos
+
     if freq is not None and freq > 0:
       state.frequency = freq
     else:
@@ -186,40 +617,83 @@ class CANParser:
     state.timeout_threshold = (1_000_000_000 / freq) * 10
 
     self.message_states[msg.address] = state
+    self.tracker.add(state)
+
+  def decode_batch(self, name_or_addr: str | int, dat: np.ndarray, nanos: np.ndarray) -> BatchResult:
+    """
+    Decode many frames of one message at once, e.g. a whole log offline. Doesn't touch the live parser state.
+    Returns one column per signal along with per-frame counter and checksum validity masks.
+    """
+    if isinstance(name_or_addr, numbers.Number):
+      msg = self.dbc.addr_to_msg.get(int(name_or_addr))
+    else:
+      msg = self.dbc.name_to_msg.get(name_or_addr)
+    if msg is None:
+      raise RuntimeError(f"could not find message {name_or_addr!r} in DBC {self.dbc_name}")
+    return decode_batch(msg, dat, nanos)
 
   @property
   def bus_timeout(self) -> bool:
-    ignore_alive = all(s.ignore_alive for s in self.message_states.values())
-    bus_timeout_threshold = 500 * 1_000_000
-    for st in self.message_states.values():
-      if st.timeout_threshold > 0:
-        bus_timeout_threshold = min(bus_timeout_threshold, st.timeout_threshold)
-    return ((self._last_update_nanos - self.last_nonempty_nanos) > bus_timeout_threshold) and not ignore_alive
+    ignore_alive = self.tracker.alive_count == 0
+    return ((self._last_update_nanos - self.last_nonempty_nanos) > self.tracker.bus_timeout_threshold) and not ignore_alive
 
   @property
   def can_valid(self) -> bool:
-    valid = True
-    counters_valid = True
-    bus_timeout = self.bus_timeout
-    for state in self.message_states.values():
-      if state.counter_fail >= MAX_BAD_COUNTER:
-        counters_valid = False
-        state.rate_limited_log(self._last_update_nanos, f"counter invalid, {state.counter_fail=} {MAX_BAD_COUNTER=}")
-      if not state.valid(self._last_update_nanos, bus_timeout):
-        valid = False
-        state.rate_limited_log(self._last_update_nanos, "not valid (timeout or missing)")
+    counters_valid = not self.tracker.counters_invalid
+    valid = self.tracker.all_valid(self._last_update_nanos)
+    if not valid or not counters_valid:
+      # only walk the messages to report the offending ones
+      bus_timeout = self.bus_timeout
+      for state in self.message_states.values():
+        if state.counter_fail >= MAX_BAD_COUNTER:
+          state.rate_limited_log(self._last_update_nanos, f"counter invalid, {state.counter_fail=} {MAX_BAD_COUNTER=}")
+        if not state.valid(self._last_update_nanos, bus_timeout):
+          state.rate_limited_log(self._last_update_nanos, "not valid (timeout or missing)")
 
     # TODO: probably only want to increment this once per update() call
     self.can_invalid_cnt = 0 if valid else min(self.can_invalid_cnt + 1, CAN_INVALID_CNT)
     return self.can_invalid_cnt < CAN_INVALID_CNT and counters_valid
 
+  def _clear_vl_all(self) -> None:
+    if self.lazy:
+      for addr in self.addresses:
+        state = self.message_states[addr]
+        if state.dats:
+          state.dats = []
+          self.vl_all[addr].invalidate()
+      return
+
+    for state in self.message_states.values():
+      state.history_len = 0
+
+  def _publish(self, state: MessageState) -> None:
+    if self.lazy:
+      dict.__getitem__(self.vl, state.address).invalidate()
+      self.vl_all[state.address].invalidate()
+      self.ts_nanos[state.address].invalidate()
+      return
+
+    vl_addr = dict.__getitem__(self.vl, state.address)
+    ts_addr = self.ts_nanos[state.address]
+
+    t = state.last_nanos
+    if state.mux >= 0:
+      # only the signals carried by this frame changed
+      vals = state.vals
+      for sp in state.active:
+        vl_addr[sp.sig.name] = vals[sp.idx]
+        ts_addr[sp.sig.name] = t
+      return
+
+    for sig, v in zip(state.signals, state.vals, strict=True):
+      vl_addr[sig.name] = v
+      ts_addr[sig.name] = t
+
   def update(self, strings, sendcan: bool = False):
     if strings and not isinstance(strings[0], list | tuple):
       strings = [strings]
 
-    for addr in self.addresses:
-      for k in self.vl_all[addr]:
-        self.vl_all[addr][k].clear()
+    self._clear_vl_all()
 
     updated_addrs: set[int] = set()
     for entry in strings:
@@ -235,27 +709,75 @@ class CANParser:
           continue
         if state.parse(t, dat):
           updated_addrs.add(address)
+          self._publish(state)
 
-          vl_addr = self.vl[address]
-          vl_all_addr = self.vl_all[address]
-          ts_addr = self.ts_nanos[address]
+      if not bus_empty:
+        self.last_nonempty_nanos = t
 
-          for i, sig in enumerate(state.signals):
-            vl_addr[sig.name] = state.vals[i]
-            vl_all_addr[sig.name] = state.all_vals[i]
-            ts_addr[sig.name] = state.timestamps[-1]
+      self._last_update_nanos = t
 
-      if not bus_empty:
+    return updated_addrs
+
+  def update_buckets(self, buckets: FrameBuckets) -> set[int]:
+    """Like update(), but takes frames already grouped by bucket_frames() and only visits this parser's bus"""
+    self._clear_vl_all()
+
+    updated_addrs: set[int] = set()
+    for t, buses in buckets:
+      by_addr = buses.get(self.bus)
+      if by_addr:
+        for address, dats in by_addr.items():
+          state = self.message_states.get(address)
+          if state is None:
+            continue
+          for dat in dats:
+            if len(dat) <= 64 and state.parse(t, dat):
+              updated_addrs.add(address)
+              self._publish(state)
         self.last_nonempty_nanos = t
 
       self._last_update_nanos = t
 
     return updated_addrs
 
+  def update_packed(self, buf, nanos: int | None = None) -> set[int]:
+    """
+    Like update(), but reads frames straight out of a contiguous buffer of PACKED_RECORD entries.
+    Payloads are passed to the decoder as memoryview slices, so no per-frame objects are built.
+    A buffer can't hold an empty cycle, so pass the cycle's timestamp as nanos for bus_timeout
+    and can_valid to advance when the bus is silent. Without it, time advances with the records.
+    """
+    mv = memoryview(buf).cast("B")
+    if len(mv) % PACKED_RECORD.size != 0:
+      raise ValueError(f"buffer size {len(mv)} is not a multiple of the {PACKED_RECORD.size} byte record size")
+
+    self._clear_vl_all()
+
+    updated_addrs: set[int] = set()
+    unpack_from = PACKED_RECORD.unpack_from
+    for off in range(0, len(mv), PACKED_RECORD.size):
+      address, src, length, t = unpack_from(mv, off)
+      self._last_update_nanos = t
+      if src != self.bus:
+        continue
+      self.last_nonempty_nanos = t
+      state = self.message_states.get(address)
+      if state is None or length > 64:
+        continue
+      dat_off = off + PACKED_PAYLOAD_OFFSET
+      if state.parse(t, mv[dat_off:dat_off + length]):
+        updated_addrs.add(address)
+        self._publish(state)
+
+    if nanos is not None:
+      self._last_update_nanos = nanos
+
+    return updated_addrs
+
 
 class CANDefine:
   def __init__(self, dbc_name: str):
-    dbc = DBC(dbc_name)
+    dbc = get_dbc(dbc_name)
 
     dv = defaultdict(dict)
     for val in dbc.vals:
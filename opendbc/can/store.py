@@ -0,0 +1,128 @@
+import json
+import os
+from collections import defaultdict
+from collections.abc import Iterable
+
+import numpy as np
+
+from opendbc.car.can_definitions import CanData
+from opendbc.can.batch import BatchResult, counter_valid, decode_batch, get_raw_values
+from opendbc.can.dbc import Msg, SignalType, get_dbc
+
+META_FILE = "meta.json"
+NANOS_FILE = "_nanos.npy"
+COUNTER_VALID_FILE = "_counter_valid.npy"
+CHECKSUM_VALID_FILE = "_checksum_valid.npy"
+
+
+def _decode(msg: Msg, dats: list[bytes], nanos: list[int]) -> BatchResult:
+  """
+  decode_batch over frames in time order, each decoded at its own length like CANParser does, so length
+  dependent checksums see the frame as sent. Signals that don't fit in a frame are NaN in its row.
+  """
+  ts = np.asarray(nanos, dtype=np.uint64)
+  order = np.argsort(ts, kind="stable")
+  ts = ts[order]
+  dats = [dats[i] for i in order]
+  lengths = np.array([len(d) for d in dats])
+
+  n = len(dats)
+  vals = {name: np.empty(n) for name in msg.sigs}
+  checksum_ok = np.ones(n, dtype=bool)
+  counters = {sig.name: np.zeros(n, dtype=np.int64) for sig in msg.sigs.values() if sig.type == SignalType.COUNTER}
+  for length in np.unique(lengths):
+    rows = np.flatnonzero(lengths == length)
+    dat = np.frombuffer(b"".join(dats[i] for i in rows), dtype=np.uint8).reshape(len(rows), length)
+    ret = decode_batch(msg, dat, ts[rows], ignore_counter=True)
+    checksum_ok[rows] = ret.checksum_valid
+    for sig in msg.sigs.values():
+      vals[sig.name][rows] = ret.vals[sig.name] if max(sig.msb, sig.lsb) // 8 < length else np.nan
+      if sig.name in counters:
+        counters[sig.name][rows] = get_raw_values(dat, sig)
+
+  # counters are checked across frames of every length
+  counter_ok = np.ones(n, dtype=bool)
+  for name, raw in counters.items():
+    counter_ok &= counter_valid(raw, msg.sigs[name].size)
+  return BatchResult(ts, vals, counter_ok, checksum_ok)
+
+
+class SignalStore:
+  """
+  Columnar on-disk store of a decoded CAN log. Each message is decoded once into a directory
+  holding one .npy array per signal plus timestamps and validity masks, which are memory-mapped
+  on read so time-range queries never decode again.
+  """
+  def __init__(self, path: str):
+    self.path = path
+    with open(os.path.join(path, META_FILE)) as f:
+      meta = json.load(f)
+    self.dbc_name: str = meta["dbc_name"]
+    self.bus: int = meta["bus"]
+    self.messages: dict[str, dict] = meta["messages"]
+    self.addr_to_name: dict[int, str] = {m["address"]: name for name, m in self.messages.items()}
+    self._arrays: dict[tuple[str, str], np.ndarray] = {}
+
+  @staticmethod
+  def build(path: str, dbc_name: str, can_packets: Iterable[tuple[int, list[CanData]]], bus: int) -> 'SignalStore':
+    """Decode every frame on bus that is defined in the DBC and write the store to path"""
+    dbc = get_dbc(dbc_name)
+
+    frames: dict[int, list[bytes]] = defaultdict(list)
+    nanos: dict[int, list[int]] = defaultdict(list)
+    for t, msgs in can_packets:
+      for address, dat, src in msgs:
+        if src != bus or address not in dbc.addr_to_msg or len(dat) > 64:
+          continue
+        frames[address].append(dat)
+        nanos[address].append(t)
+
+    os.makedirs(path, exist_ok=True)
+    messages = {}
+    for address, dats in frames.items():
+      msg = dbc.addr_to_msg[address]
+      ret = _decode(msg, dats, nanos[address])
+
+      msg_path = os.path.join(path, msg.name)
+      os.makedirs(msg_path, exist_ok=True)
+      np.save(os.path.join(msg_path, NANOS_FILE), ret.nanos)
+      np.save(os.path.join(msg_path, COUNTER_VALID_FILE), ret.counter_valid)
+      np.save(os.path.join(msg_path, CHECKSUM_VALID_FILE), ret.checksum_valid)
+      for sig_name, vals in ret.vals.items():
+        np.save(os.path.join(msg_path, sig_name + ".npy"), vals)
+      messages[msg.name] = {"address": address, "rows": len(dats), "signals": list(ret.vals.keys())}
+
+    with open(os.path.join(path, META_FILE), "w") as f:
+      json.dump({"dbc_name": dbc.name, "bus": bus, "messages": messages}, f, indent=2)
+
+    return SignalStore(path)
+
+  def _load(self, msg_name: str, file_name: str) -> np.ndarray:
+    key = (msg_name, file_name)
+    arr = self._arrays.get(key)
+    if arr is None:
+      arr = np.load(os.path.join(self.path, msg_name, file_name), mmap_mode="r")
+      self._arrays[key] = arr
+    return arr
+
+  def query(self, name_or_addr: str | int, signals: Iterable[str] | None = None,
+            start_nanos: int | None = None, end_nanos: int | None = None) -> BatchResult:
+    """Return the requested signals for frames with start_nanos <= t < end_nanos, as read-only memory-mapped views"""
+    msg_name = self.addr_to_name.get(name_or_addr, name_or_addr) if isinstance(name_or_addr, int) else name_or_addr
+    if msg_name not in self.messages:
+      raise KeyError(name_or_addr)
+
+    nanos = self._load(msg_name, NANOS_FILE)
+    lo = 0 if start_nanos is None else int(np.searchsorted(nanos, np.uint64(start_nanos), side="left"))
+    hi = len(nanos) if end_nanos is None else int(np.searchsorted(nanos, np.uint64(end_nanos), side="left"))
+
+    if signals is None:
+      signals = self.messages[msg_name]["signals"]
+    vals = {}
+    for sig_name in signals:
+      if sig_name not in self.messages[msg_name]["signals"]:
+        raise KeyError(f"{sig_name} not in {msg_name}")
+      vals[sig_name] = self._load(msg_name, sig_name + ".npy")[lo:hi]
+
+    return BatchResult(nanos[lo:hi], vals, self._load(msg_name, COUNTER_VALID_FILE)[lo:hi],
+                       self._load(msg_name, CHECKSUM_VALID_FILE)[lo:hi])
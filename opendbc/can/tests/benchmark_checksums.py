@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+import random
+import time
+from binascii import crc_hqx
+
+from opendbc.car.crc import CRC8H2F, CRC16_XMODEM
+
+
+def slice_tables(table: list[int], n: int) -> list[list[int]]:
+  # tables[k][x] is the CRC8 of byte x followed by k zero bytes
+  tables = [table]
+  for _ in range(n - 1):
+    tables.append([table[x] for x in tables[-1]])
+  return tables
+
+
+CRC8H2F_SLICE8 = slice_tables(CRC8H2F, 8)
+
+
+def crc8_bytewise(d: bytes) -> int:
+  crc = 0xFF
+  for b in d:
+    crc = CRC8H2F[crc ^ b]
+  return crc
+
+
+def crc8_slice8(d: bytes) -> int:
+  t0, t1, t2, t3, t4, t5, t6, t7 = CRC8H2F_SLICE8
+  crc = 0xFF
+  i = 0
+  while len(d) - i >= 8:
+    crc = (t7[crc ^ d[i]] ^ t6[d[i + 1]] ^ t5[d[i + 2]] ^ t4[d[i + 3]] ^
+           t3[d[i + 4]] ^ t2[d[i + 5]] ^ t1[d[i + 6]] ^ t0[d[i + 7]])
+    i += 8
+  for b in d[i:]:
+    crc = t0[crc ^ b]
+  return crc
+
+
+def crc16_bytewise(d: bytes) -> int:
+  crc = 0
+  for b in d:
+    crc = ((crc << 8) ^ CRC16_XMODEM[(crc >> 8) ^ b]) & 0xFFFF
+  return crc
+
+
+def _benchmark(name, fn, frames, n=5):
+  ets = []
+  for _ in range(n):
+    t1 = time.process_time_ns()
+    for d in frames:
+      fn(d)
+    t2 = time.process_time_ns()
+    ets.append(t2 - t1)
+  print('  %-24s %.2fus/frame' % (name, min(ets) / len(frames) / 1e3))
+
+
+if __name__ == "__main__":
+  # python -m opendbc.can.tests.benchmark_checksums
+  for size in (8, 32, 64):
+    frames = [random.randbytes(size) for _ in range(10000)]
+    assert all(crc8_slice8(d) == crc8_bytewise(d) for d in frames)
+    assert all(crc_hqx(d, 0) == crc16_bytewise(d) for d in frames)
+    print(f"{size} byte frames")
+    _benchmark("crc8 bytewise", crc8_bytewise, frames)
+    _benchmark("crc8 slice-by-8", crc8_slice8, frames)
+    _benchmark("crc16 bytewise", crc16_bytewise, frames)
+    _benchmark("crc16 binascii.crc_hqx", lambda d: crc_hqx(d, 0), frames)
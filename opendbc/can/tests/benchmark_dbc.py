@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+import os
+import time
+
+from opendbc import DBC_PATH
+from opendbc.can import dbc
+from opendbc.can.tests import ALL_DBCS
+
+
+def _benchmark(lazy, n=5):
+  # cold start: bypass the registry and on-disk caches
+  dbc.DBC_CACHE_DIR = ""
+  size = sum(os.path.getsize(os.path.join(DBC_PATH, name + ".dbc")) for name in ALL_DBCS)
+
+  ets = []
+  for _ in range(n):
+    t1 = time.process_time_ns()
+    for name in ALL_DBCS:
+      dbc.DBC(name, lazy=lazy)
+    t2 = time.process_time_ns()
+    ets.append(t2 - t1)
+
+  et = min(ets)
+  print('[lazy=%d] %.1fms to parse %d DBCs (%.1f MB), %.1f MB/s' % (lazy, et/1e6, len(ALL_DBCS), size/1e6, size/1e6 / (et/1e9)))
+
+
+if __name__ == "__main__":
+  # python -m opendbc.can.tests.benchmark_dbc
+  _benchmark(False)
+  _benchmark(True)
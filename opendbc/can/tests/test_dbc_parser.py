@@ -1,5 +1,13 @@
+import os
+
+import pytest
+
 from opendbc.can import CANParser
-from opendbc.can.tests import ALL_DBCS
+from opendbc.can import dbc as dbc_module
+from opendbc.can.tests import ALL_DBCS, TEST_DBC
+
+# constructing DBCs directly bypasses the registry
+DBC = dbc_module.DBC
 
 
 class TestDBCParser:
@@ -19,3 +27,157 @@ class TestDBCParser:
     for dbc in ALL_DBCS:
       with subtests.test(dbc=dbc):
         CANParser(dbc, [], 0)
+
+  def test_dbc_cache(self, tmp_path, monkeypatch):
+    monkeypatch.setattr(dbc_module, "DBC_LAZY_LOAD", False)
+    monkeypatch.setattr(dbc_module, "DBC_SHARED_DIR", "")
+    monkeypatch.setattr(dbc_module, "DBC_CACHE_DIR", "")
+    uncached = {name: DBC(name) for name in ALL_DBCS}
+    assert not os.listdir(tmp_path)
+
+    monkeypatch.setattr(dbc_module, "DBC_CACHE_DIR", str(tmp_path))
+    for _ in range(2):  # write, then read back
+      for name, expected in uncached.items():
+        dbc = DBC(name)
+        assert dbc.msgs == expected.msgs
+        assert dbc.name_to_msg == expected.name_to_msg
+        assert dbc.vals == expected.vals
+    assert len(os.listdir(tmp_path)) == len(ALL_DBCS)
+
+  def test_dbc_cache_invalidation(self, tmp_path, monkeypatch):
+    monkeypatch.setattr(dbc_module, "DBC_LAZY_LOAD", False)
+    monkeypatch.setattr(dbc_module, "DBC_SHARED_DIR", "")
+    monkeypatch.setattr(dbc_module, "DBC_CACHE_DIR", str(tmp_path / "cache"))
+    path = str(tmp_path / "test.dbc")
+    with open(TEST_DBC) as f:
+      content = f.read()
+    with open(path, "w") as f:
+      f.write(content)
+    assert "STEERING_CONTROL" in DBC(path).name_to_msg
+
+    # changed content is parsed again
+    with open(path, "w") as f:
+      f.write(content.replace("STEERING_CONTROL", "STEERING_CONTROL_2"))
+    assert "STEERING_CONTROL_2" in DBC(path).name_to_msg
+
+    # corrupt cache files are ignored
+    for f in os.listdir(tmp_path / "cache"):
+      with open(tmp_path / "cache" / f, "wb") as cache_file:
+        cache_file.write(b"garbage")
+    assert "STEERING_CONTROL_2" in DBC(path).name_to_msg
+
+  @pytest.mark.parametrize("cache_var", ["DBC_CACHE_DIR", "DBC_SHARED_DIR"])
+  def test_dbc_cache_signal_types(self, tmp_path, monkeypatch, cache_var):
+    """Signal types come from the current rules, not from the cache"""
+    monkeypatch.setattr(dbc_module, "DBC_LAZY_LOAD", False)
+    monkeypatch.setattr(dbc_module, "DBC_SHARED_DIR", "")
+    monkeypatch.setattr(dbc_module, "DBC_CACHE_DIR", "")
+    monkeypatch.setattr(dbc_module, cache_var, str(tmp_path))
+    name = "honda_civic_touring_2016_can_generated"
+    sig = DBC(name).name_to_msg["STEERING_CONTROL"].sigs["CHECKSUM"]
+    assert sig.type == dbc_module.SignalType.HONDA_CHECKSUM and sig.calc_checksum is not None
+    assert os.listdir(tmp_path)
+
+    monkeypatch.setattr(dbc_module, "get_checksum_state", lambda dbc_name: None)
+    sig = DBC(name).name_to_msg["STEERING_CONTROL"].sigs["CHECKSUM"]
+    assert sig.type == dbc_module.SignalType.DEFAULT and sig.calc_checksum is None
+
+  def test_lazy_dbc(self, monkeypatch):
+    monkeypatch.setattr(dbc_module, "DBC_CACHE_DIR", "")
+    monkeypatch.setattr(dbc_module, "DBC_SHARED_DIR", "")
+    for name in ALL_DBCS:
+      eager = DBC(name, lazy=False)
+      lazy = DBC(name, lazy=True)
+      assert lazy.name_to_msg.keys() == eager.name_to_msg.keys()
+      assert all(msg._sigs is None for msg in lazy.msgs.values())
+      for address, msg in eager.msgs.items():
+        lazy_msg = lazy.msgs[address]
+        assert (lazy_msg.name, lazy_msg.size, lazy_msg.sigs) == (msg.name, msg.size, msg.sigs)
+      assert lazy.vals == eager.vals
+
+  def test_shared_dbc(self, tmp_path, monkeypatch):
+    monkeypatch.setattr(dbc_module, "DBC_CACHE_DIR", "")
+    monkeypatch.setattr(dbc_module, "DBC_SHARED_DIR", "")
+    expected = {name: DBC(name) for name in ALL_DBCS}
+
+    monkeypatch.setattr(dbc_module, "DBC_SHARED_DIR", str(tmp_path))
+    for _ in range(2):  # compile, then map the existing tables
+      for name, eager in expected.items():
+        dbc = DBC(name)
+        assert not any(msg.loaded for msg in dbc.msgs.values())
+        assert dbc.name_to_msg.keys() == eager.name_to_msg.keys()
+        for address, msg in eager.msgs.items():
+          shared_msg = dbc.msgs[address]
+          assert (shared_msg.name, shared_msg.size, shared_msg.sigs) == (msg.name, msg.size, msg.sigs)
+        assert dbc.vals == eager.vals
+    assert len(os.listdir(tmp_path)) == len(ALL_DBCS)
+
+  def test_dbc_registry(self, monkeypatch):
+    monkeypatch.setattr(dbc_module, "DBC_SHARED_DIR", "")
+    sizes = {name: DBC(name).nbytes for name in ALL_DBCS[:3]}
+    registry = dbc_module.DBCRegistry(sum(sizes.values()))
+    a, b, c = sizes
+
+    dbc_a = registry.get(a)
+    assert registry.get(a) is dbc_a
+    registry.get(b)
+    registry.get(c)
+    assert len(registry) == 3 and registry.nbytes == sum(sizes.values())
+
+    # least recently used goes first
+    registry.get(a)
+    registry.max_bytes = sizes[a] + sizes[c]
+    registry.get(c)
+    assert (b, None) not in registry
+    assert (a, None) in registry and (c, None) in registry
+
+    # the newest DBC is kept even when over budget by itself
+    registry.max_bytes = 0
+    assert registry.get(b) is not None
+    assert len(registry) == 1 and (b, None) in registry
+    assert registry.nbytes == sizes[b]
+
+    # lazy DBCs are measured again as they grow
+    registry.max_bytes = 1 << 30
+    lazy = registry.get(a, True)
+    nbytes = registry.nbytes
+    sigs = max(lazy.msgs.values(), key=lambda msg: msg.size).sigs
+    registry.get(a, True)
+    assert registry.nbytes == nbytes + dbc_module.SIGNAL_BYTES * len(sigs) > nbytes
+    assert registry.nbytes == sizes[b] + lazy.nbytes
+
+    registry.clear()
+    assert registry.nbytes == 0
+
+  def test_big_endian_lsb(self):
+    be_bits = [j + i * 8 for i in range(64) for j in range(7, -1, -1)]
+    for start_bit in range(64):
+      for size in range(1, 65 - be_bits.index(start_bit) % 64):
+        sigs = dbc_module.parse_signals(f'\n SG_ SIG : {start_bit}|{size}@0+ (1,0) [0|1] "" XXX', 1, "test", None)
+        assert sigs["SIG"].lsb == be_bits[be_bits.index(start_bit) + size - 1]
+        assert sigs["SIG"].msb == start_bit
+
+  def test_separated_signals(self, tmp_path, monkeypatch):
+    """SG_ lines belong to the most recent BO_, even with blank lines or comments in between"""
+    monkeypatch.setattr(dbc_module, "DBC_SHARED_DIR", "")
+    monkeypatch.setattr(dbc_module, "DBC_CACHE_DIR", "")
+    path = tmp_path / "test_separated.dbc"
+    path.write_text("\n".join([
+      'VERSION ""',
+      '',
+      'BO_ 100 MSG1: 8 XXX',
+      '',
+      ' SG_ A : 0|8@1+ (1,0) [0|255] "" XXX',
+      '',
+      '// comment',
+      ' SG_ B : 8|8@1+ (1,0) [0|255] "" XXX',
+      '',
+      'CM_ "comment";',
+      'BO_ 200 MSG2: 8 XXX',
+      ' SG_ C : 0|8@1+ (1,0) [0|255] "" XXX',
+      '',
+      ' SG_ D : 8|8@1+ (1,0) [0|255] "" XXX',
+    ]))
+    for lazy in (False, True):
+      dbc = DBC(str(path), lazy=lazy)
+      assert {msg.name: list(msg.sigs) for msg in dbc.msgs.values()} == {'MSG1': ['A', 'B'], 'MSG2': ['C', 'D']}
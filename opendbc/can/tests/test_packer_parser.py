@@ -1,8 +1,15 @@
+import copy
+import math
+import numpy as np
 import pytest
 import random
 
-from opendbc.can import CANPacker, CANParser
-from opendbc.can.tests import TEST_DBC
+from opendbc.can import CANPacker, CANParser, bucket_frames
+from opendbc.can.batch import get_raw_values, rolling_counter_valid
+from opendbc.can.dbc import Signal, SignalType
+from opendbc.can.packer import set_value
+from opendbc.can.parser import MessageState, get_raw_value, pack_records
+from opendbc.can.tests import ALL_DBCS, TEST_DBC
 
 MAX_BAD_COUNTER = 5
 
@@ -47,6 +54,39 @@ class TestCanParserPacker:
       parser.update([0, [msg]])
       assert parser.vl["CAN_FD_MESSAGE"]["COUNTER"] == ((cnt + i) % 256)
 
+  def test_packer_static(self):
+    """Packing on a prebaked static base matches packing every value, with counter and checksum still updated"""
+    dbc = "honda_civic_touring_2016_can_generated"
+    packer, packer_static = CANPacker(dbc), CANPacker(dbc)
+    static = {"STEER_TORQUE_REQUEST": 1, "SET_ME_X00": 0}
+    for i in range(100):
+      values = {"STEER_TORQUE": random.randint(-3840, 3840)}
+      if i % 10 == 0:
+        values["STEER_TORQUE_REQUEST"] = 0
+      assert packer_static.make_can_msg("STEERING_CONTROL", 0, values, static) == \
+             packer.make_can_msg("STEERING_CONTROL", 0, {**static, **values})
+    assert len(packer_static.static_bases) == 1
+
+    # a static counter is set every frame
+    for _ in range(5):
+      dat = packer_static.make_can_msg("STEERING_CONTROL", 0, {}, {"COUNTER": 2})[1]
+      assert dat == packer.make_can_msg("STEERING_CONTROL", 0, {"COUNTER": 2})[1]
+
+  def test_packer_batch(self):
+    """make_can_msgs matches make_can_msg called in order"""
+    dbc = "honda_civic_touring_2016_can_generated"
+    packer, packer_batch = CANPacker(dbc), CANPacker(dbc)
+    for i in range(50):
+      msgs = [
+        ("STEERING_CONTROL", 0, {"STEER_TORQUE": i}),
+        (0x1fa, 0, {"COMPUTER_BRAKE": i, "CRUISE_OVERRIDE": 1}),
+        ("STEERING_CONTROL", 2, {"STEER_TORQUE": -i}, {"STEER_TORQUE_REQUEST": 1}),
+        ("UNKNOWN_MESSAGE", 1, {}),
+      ]
+      expected = [packer.make_can_msg(*m) for m in msgs]
+      assert packer_batch.make_can_msgs(msgs) == expected
+    assert expected[-1] == (0, b'', 1)
+
   def test_parser_can_valid(self):
     msgs = [("CAN_FD_MESSAGE", 10), ]
     packer = CANPacker(TEST_DBC)
@@ -175,6 +215,212 @@ class TestCanParserPacker:
         for sig in ("STEER_TORQUE", "STEER_TORQUE_REQUEST", "COUNTER", "CHECKSUM"):
           assert parser.vl["STEERING_CONTROL"][sig] == parser.vl[228][sig]
 
+  def test_signal_plans(self):
+    """Precompiled signal plans must match the reference bit walk, including payloads shorter than the DBC size"""
+    for dbc in ALL_DBCS + [TEST_DBC]:
+      parser = CANParser(dbc, [], 0)
+      for msg in parser.dbc.msgs.values():
+        parser._add_message(msg.address)
+        state = parser.message_states[msg.address]
+        for dat_len in {msg.size, max(msg.size // 2, 1)}:
+          dat = bytes(random.getrandbits(8) for _ in range(dat_len))
+          le = int.from_bytes(dat, "little")
+          be = int.from_bytes(dat, "big")
+          for sp in state.compile(dat_len):
+            expected = get_raw_value(dat, sp.sig)
+            if sp.shift >= 0:
+              assert (((le if sp.little_endian else be) >> sp.shift) & sp.mask) == expected, (dbc, msg.name, sp.sig.name)
+
+  def test_pack_templates(self):
+    """Compiled packing templates must match the reference bit walk, including overlapping signals of mixed byte order"""
+    for dbc in ALL_DBCS + [TEST_DBC]:
+      packer = CANPacker(dbc)
+      for msg in packer.dbc.msgs.values():
+        values = {}
+        expected = bytearray(msg.size)
+        for sig in msg.sigs.values():
+          if sig.type > SignalType.COUNTER or sig.type == SignalType.COUNTER or sig.name == "COUNTER":
+            continue
+          values[sig.name] = random.getrandbits(sig.size) * sig.factor + sig.offset
+          set_value(expected, sig, math.floor((values[sig.name] - sig.offset) / sig.factor + 0.5))
+        tmpl = packer.template(msg.name)
+        if tmpl.counter is not None:
+          set_value(expected, tmpl.counter.sig, 0)
+        if tmpl.checksum is not None:
+          set_value(expected, tmpl.checksum.sig, tmpl.checksum.sig.calc_checksum(msg.address, tmpl.checksum.sig, expected))
+        assert packer.pack(msg.address, values) == expected, (dbc, msg.name)
+
+  def test_decode_batch(self):
+    """Batch decode matches frame by frame decode"""
+    for dbc in ("honda_civic_touring_2016_can_generated", "toyota_nodsu_pt_generated", "vw_mqb", TEST_DBC):
+      parser = CANParser(dbc, [], 0)
+      for msg in parser.dbc.msgs.values():
+        dat = np.random.randint(0, 256, (20, msg.size), dtype=np.uint8)
+        ret = parser.decode_batch(msg.name, dat, np.arange(20))
+        mux = next((s for s in msg.sigs.values() if s.multiplexer and s.multiplex_value is None), None)
+        for sig in msg.sigs.values():
+          raw = [get_raw_value(bytes(row), sig) for row in dat]
+          if sig.is_signed:
+            raw = [r - ((r >> (sig.size - 1)) & 1) * (1 << sig.size) for r in raw]
+          expected = [r * sig.factor + sig.offset for r in raw]
+          if mux is not None and sig.multiplex_value is not None:
+            expected = [v if get_raw_value(bytes(row), mux) == sig.multiplex_value else math.nan for v, row in zip(expected, dat, strict=True)]
+          assert ret.vals[sig.name] == pytest.approx(expected, nan_ok=True), (dbc, msg.name, sig.name)
+
+  def test_decode_batch_wide_signals(self):
+    """Signed raw values are sign extended exactly up to 64 bits"""
+    dat = np.random.randint(0, 256, (50, 8), dtype=np.uint8)
+    dat[:2] = [[0x00] * 8, [0xff] * 8]
+    sigs = [Signal(f"LE_{size}", 0, size - 1, 0, size, True, 1, 0, True) for size in range(1, 65)]
+    sigs += [Signal("BE_63", 6, 6, 56, 63, True, 1, 0, False), Signal("BE_64", 7, 7, 56, 64, True, 1, 0, False)]
+    for sig in sigs:
+      expected = []
+      for row in dat:
+        r = get_raw_value(bytes(row), sig)
+        expected.append(r - (1 << sig.size) if r >> (sig.size - 1) else r)
+      assert get_raw_values(dat, sig).tolist() == expected, sig.name
+
+  def test_decode_batch_validity(self):
+    dbc_file = "honda_civic_touring_2016_can_generated"
+    parser = CANParser(dbc_file, [], 0)
+    packer = CANPacker(dbc_file)
+
+    frames = [packer.make_can_msg("STEERING_CONTROL", 0, {"STEER_TORQUE": i}) for i in range(10)]
+    dat = np.array([list(f[1]) for f in frames], dtype=np.uint8)
+    dat[4, 4] ^= 0x01  # bad checksum
+    dat = np.delete(dat, 7, axis=0)  # skipped counter
+
+    ret = parser.decode_batch("STEERING_CONTROL", dat, np.arange(len(dat)) * 10_000_000)
+    assert list(ret.vals["STEER_TORQUE"][:4]) == [0, 1, 2, 3]
+    assert list(np.flatnonzero(~ret.checksum_valid)) == [4]
+    assert list(np.flatnonzero(~ret.counter_valid)) == [7]
+
+    with pytest.raises(RuntimeError):
+      parser.decode_batch("UNKNOWN_MESSAGE", dat, np.arange(len(dat)))
+
+  def test_rolling_counter_valid(self):
+    """Vectorized rolling counter validity matches MessageState.update_counter frame by frame"""
+    for _ in range(20):
+      counters = np.arange(300) % 16
+      # runs of stuck and skipped counters
+      for start in np.random.randint(0, 300, 10):
+        counters[start:start + random.randint(1, 12)] = random.randint(0, 15)
+      state = MessageState(0, "", 8, [])
+      expected = [state.update_counter(int(c), 4) for c in counters]
+      assert list(rolling_counter_valid(counters, 4)) == expected
+
+  def test_update_packed(self):
+    """Packed buffer input decodes the same as nested frame lists"""
+    dbc_file = "honda_civic_touring_2016_can_generated"
+    msgs = [("STEERING_CONTROL", 100), ("VSA_STATUS", 50)]
+    parser = CANParser(dbc_file, msgs, 0)
+    parser_packed = CANParser(dbc_file, msgs, 0)
+    packer = CANPacker(dbc_file)
+
+    for i in range(50):
+      can_packets = []
+      for j in range(3):
+        t = int((i * 3 + j) * 1e7)
+        can_packets.append((t, [
+          packer.make_can_msg("STEERING_CONTROL", 0, {"STEER_TORQUE": random.randint(-100, 100)}),
+          packer.make_can_msg("VSA_STATUS", 0, {"USER_BRAKE": random.randint(0, 50)}),
+          (0x123, b"\x01" * 8, 1),
+        ]))
+      assert parser.update(can_packets) == parser_packed.update_packed(pack_records(can_packets))
+      assert parser.vl == parser_packed.vl
+      assert parser.vl_all == parser_packed.vl_all
+      assert parser.ts_nanos == parser_packed.ts_nanos
+      assert parser.can_valid == parser_packed.can_valid
+
+    with pytest.raises(ValueError):
+      parser.update_packed(b"\x00" * 10)
+
+  def test_update_packed_bus_timeout(self):
+    """Cycle timestamps passed to update_packed advance bus_timeout and can_valid on a silent bus"""
+    dbc_file = "honda_civic_touring_2016_can_generated"
+    msgs = [("VSA_STATUS", 100)]
+    parser = CANParser(dbc_file, msgs, 0)
+    parser_packed = CANParser(dbc_file, msgs, 0)
+    packer = CANPacker(dbc_file)
+
+    for i in range(1, 300):
+      t = i * 10_000_000
+      frames = [packer.make_can_msg("VSA_STATUS", 0, {})] if i < 100 or i > 250 else []
+      parser.update([t, frames])
+      parser_packed.update_packed(pack_records([(t, frames)]), t)
+      assert parser.bus_timeout == parser_packed.bus_timeout
+      assert parser.can_valid == parser_packed.can_valid
+      if 120 < i < 250:
+        assert parser_packed.bus_timeout and not parser_packed.can_valid
+
+  def test_update_buckets(self):
+    """Parsers fed from shared frame buckets match parsers scanning every frame"""
+    dbc_file = "honda_civic_touring_2016_can_generated"
+    msgs = [("STEERING_CONTROL", 100), ("VSA_STATUS", 50)]
+    parsers = [CANParser(dbc_file, msgs, bus) for bus in range(3)]
+    parsers_bucketed = [CANParser(dbc_file, msgs, bus) for bus in range(3)]
+    packers = [CANPacker(dbc_file) for _ in range(3)]
+
+    for i in range(100):
+      can_packets = []
+      for j in range(random.randint(0, 3)):
+        frames = []
+        for bus in random.sample(range(3), random.randint(0, 3)):
+          frames.append(packers[bus].make_can_msg("STEERING_CONTROL", bus, {"STEER_TORQUE": random.randint(-100, 100)}))
+          frames.append(packers[bus].make_can_msg("VSA_STATUS", bus, {"USER_BRAKE": i}))
+          frames.append((0x123, b"\x00" * 8, bus))
+        random.shuffle(frames)
+        can_packets.append((int((i * 3 + j) * 1e7), frames))
+
+      buckets = bucket_frames(can_packets)
+      for parser, parser_bucketed in zip(parsers, parsers_bucketed, strict=True):
+        assert parser.update(can_packets) == parser_bucketed.update_buckets(buckets)
+        assert parser.vl == parser_bucketed.vl
+        assert parser.vl_all == parser_bucketed.vl_all
+        assert parser.ts_nanos == parser_bucketed.ts_nanos
+        assert parser.can_valid == parser_bucketed.can_valid
+        assert parser.bus_timeout == parser_bucketed.bus_timeout
+
+  def test_lazy_parser(self):
+    """Lazy parsing reads the same values as eager parsing and still rejects bad counters and checksums"""
+    dbc_file = "honda_civic_touring_2016_can_generated"
+    msgs = [("STEERING_CONTROL", 100), ("VSA_STATUS", 50)]
+    parser = CANParser(dbc_file, msgs, 0)
+    parser_lazy = CANParser(dbc_file, msgs, 0, lazy=True)
+    packer = CANPacker(dbc_file)
+
+    for i in range(200):
+      can_packets = []
+      for j in range(random.randint(0, 3)):
+        msg = packer.make_can_msg("STEERING_CONTROL", 0, {"STEER_TORQUE": random.randint(-100, 100)})
+        if i % 20 == 0:
+          msg = (msg[0], msg[1][:4] + bytes([msg[1][4] ^ 0x1]), msg[2])
+        can_packets.append((int((i * 3 + j) * 1e7), [msg, packer.make_can_msg("VSA_STATUS", 0, {"USER_BRAKE": i})]))
+      assert parser.update(can_packets) == parser_lazy.update(can_packets)
+
+      # single signal reads before bulk reads
+      assert parser.vl["STEERING_CONTROL"]["STEER_TORQUE"] == parser_lazy.vl["STEERING_CONTROL"]["STEER_TORQUE"]
+      assert parser.vl_all[420]["USER_BRAKE"] == parser_lazy.vl_all[420]["USER_BRAKE"]
+      assert parser.vl == parser_lazy.vl
+      for name, sigs in parser_lazy.vl_all.items():
+        assert {s: parser.vl_all[name][s] for s in sigs} == sigs
+      assert parser.ts_nanos == parser_lazy.ts_nanos
+      assert parser.can_valid == parser_lazy.can_valid
+      assert copy.deepcopy(parser_lazy.vl["VSA_STATUS"]) == dict(parser.vl["VSA_STATUS"].items())
+
+  def test_lazy_parser_bulk_reads(self):
+    """dict() and ** unpacking of lazy signal dicts decode the latest frame, without a prior single-signal read"""
+    dbc_file = "honda_civic_touring_2016_can_generated"
+    parser = CANParser(dbc_file, [("STEERING_CONTROL", 100)], 0, lazy=True)
+    packer = CANPacker(dbc_file)
+
+    for i, torque in enumerate((1, 102, -5)):
+      parser.update([i, [packer.make_can_msg("STEERING_CONTROL", 0, {"STEER_TORQUE": torque})]])
+      assert dict(parser.vl["STEERING_CONTROL"])["STEER_TORQUE"] == torque
+      assert {**parser.vl["STEERING_CONTROL"]}["STEER_TORQUE"] == torque
+      assert dict(parser.vl_all["STEERING_CONTROL"])["STEER_TORQUE"] == [torque]
+      assert list(parser.ts_nanos["STEERING_CONTROL"].values()) == [i] * len(parser.ts_nanos["STEERING_CONTROL"])
+
   def test_scale_offset(self):
     """Test that both scale and offset are correctly preserved"""
     dbc_file = "honda_civic_touring_2016_can_generated"
@@ -217,6 +463,37 @@ class TestCanParserPacker:
         assert parser.vl["ES_LKAS"]["COUNTER"] == pytest.approx(idx % 16)
         idx += 1
 
+  def test_checksum_memo(self):
+    """Repeated payloads reuse the last checksum verdict"""
+    dbc_file = "hyundai_canfd_generated"
+    parser = CANParser(dbc_file, [("LKAS", 0)], 0)
+    packer = CANPacker(dbc_file)
+    state = parser.message_states[packer.template("LKAS").address]
+    state.ignore_counter = True
+
+    calls = 0
+    idx, calc = next(iter(state.checksums.items()))
+
+    def counted(dat):
+      nonlocal calls
+      calls += 1
+      return calc(dat)
+    state.checksums[idx] = counted
+
+    frame = packer.make_can_msg("LKAS", 0, {"COUNTER": 3, "TORQUE_REQUEST": 10})
+    for i in range(5):
+      assert parser.update([i, [frame]]) == {frame[0]}
+    assert calls == 1
+    assert parser.vl["LKAS"]["TORQUE_REQUEST"] == 10
+
+    # a bad checksum stays bad while the payload repeats, and a new payload is checked again
+    bad = (frame[0], bytes([frame[1][0] ^ 1]) + frame[1][1:], 0)
+    for i in range(5):
+      assert parser.update([10 + i, [bad]]) == set()
+    assert calls == 2
+    assert parser.update([20, [frame]]) == {frame[0]}
+    assert calls == 3
+
   def test_bus_timeout(self):
     """Test CAN bus timeout detection"""
     dbc_file = "honda_civic_touring_2016_can_generated"
@@ -255,6 +532,52 @@ class TestCanParserPacker:
     send_msg()
     assert not parser.bus_timeout
 
+  def test_incremental_validity(self):
+    """Incrementally tracked validity matches checking every message"""
+    dbc_file = "honda_civic_touring_2016_can_generated"
+    names = ["STEERING_CONTROL", "VSA_STATUS", "POWERTRAIN_DATA", "CAR_SPEED", "CRUISE", "STEER_STATUS"]
+    parser = CANParser(dbc_file, [(n, random.choice([0, 10, 50, 100])) for n in names], 0)
+    packer = CANPacker(dbc_file)
+
+    def reference_valid():
+      counters_valid = all(st.counter_fail < MAX_BAD_COUNTER for st in parser.message_states.values())
+      valid = all(st.valid(parser._last_update_nanos, False) for st in parser.message_states.values())
+      return valid, counters_valid
+
+    t = 0
+    for i in range(3000):
+      t += random.choice([10_000_000, 10_000_000, 100_000_000, 2_000_000_000])
+      msgs = []
+      for n in random.sample(names, random.randint(0, len(names))):
+        values = {"COUNTER": random.randint(0, 3)} if i % 50 > 45 else {}
+        msgs.append(packer.make_can_msg(n, 0, values))
+      parser.update([t, msgs])
+      valid, counters_valid = reference_valid()
+      assert parser.tracker.all_valid(parser._last_update_nanos) == valid
+      assert (not parser.tracker.counters_invalid) == counters_valid
+
+  def test_frequency_estimation(self):
+    dbc_file = "honda_civic_touring_2016_can_generated"
+    parser = CANParser(dbc_file, [("VSA_STATUS", 0), ("POWERTRAIN_DATA", 0)], 0)
+    packer = CANPacker(dbc_file)
+    vsa = parser.message_states[420]
+    powertrain = parser.message_states[380]
+
+    # frames without time passing never teach a frequency
+    for _ in range(1200):
+      parser.update([0, [packer.make_can_msg("POWERTRAIN_DATA", 0, {})]])
+    assert powertrain.frequency == 0
+
+    for i in range(1, 200):
+      t = i * 20_000_000
+      parser.update([t, [packer.make_can_msg("VSA_STATUS", 0, {}), packer.make_can_msg("POWERTRAIN_DATA", 0, {})]])
+      if t <= 1e9:
+        assert vsa.frequency == 0
+    assert vsa.frequency == pytest.approx(50, rel=0.05)
+    assert vsa.timeout_threshold == pytest.approx(200_000_000, rel=0.05)
+    assert powertrain.frequency > 0
+    assert parser.can_valid
+
   def test_updated(self):
     """Test updated value dict"""
     dbc_file = "honda_civic_touring_2016_can_generated"
@@ -284,6 +607,23 @@ class TestCanParserPacker:
       if len(user_brake_vals):
         assert vl_all[-1] == parser.vl["VSA_STATUS"]["USER_BRAKE"]
 
+  def test_vl_all_history(self):
+    """vl_all keeps every frame of an update, past the preallocated capacity, and resets between updates"""
+    dbc_file = "honda_civic_touring_2016_can_generated"
+    parser = CANParser(dbc_file, [("VSA_STATUS", 50)], 0)
+    packer = CANPacker(dbc_file)
+
+    user_brake = parser.vl_all["VSA_STATUS"]["USER_BRAKE"]
+    for n in (1, 100, 3, 0, 40):
+      vals = [random.randrange(100) for _ in range(n)]
+      parser.update([[0, [packer.make_can_msg("VSA_STATUS", 0, {"USER_BRAKE": v}) for v in vals]]])
+      assert parser.vl_all["VSA_STATUS"]["USER_BRAKE"] == vals
+      assert user_brake == vals
+      assert user_brake[1:3] == vals[1:3]
+      assert copy.deepcopy(user_brake) == vals and isinstance(copy.copy(user_brake), list)
+      if n:
+        assert user_brake[-1] == parser.vl["VSA_STATUS"]["USER_BRAKE"] == vals[-1]
+
   def test_timestamp_nanos(self):
     """Test message timestamp dict"""
     dbc_file = "honda_civic_touring_2016_can_generated"
@@ -349,6 +689,64 @@ class TestCanParserPacker:
       "CHECKSUM": 0,
     }
 
+  def test_signal_subset(self):
+    parser = CANParser("toyota_nodsu_pt_generated", [("ACC_CONTROL", 0, ["ACCEL_CMD", "CANCEL_REQ"]), ("PCM_CRUISE", 0)], 0)
+    packer = CANPacker("toyota_nodsu_pt_generated")
+
+    # checksum is always decoded for validation
+    assert parser.vl["ACC_CONTROL"] == {"ACCEL_CMD": 0, "CANCEL_REQ": 0, "CHECKSUM": 0}
+    assert set(parser.ts_nanos["ACC_CONTROL"]) == {"ACCEL_CMD", "CANCEL_REQ", "CHECKSUM"}
+    assert len(parser.vl["PCM_CRUISE"]) > 3
+
+    msg = packer.make_can_msg("ACC_CONTROL", 0, {"ACCEL_CMD": 1.5, "CANCEL_REQ": 1, "DISTANCE": 1})
+    parser.update([0, [msg]])
+    assert parser.vl["ACC_CONTROL"]["ACCEL_CMD"] == pytest.approx(1.5)
+    assert parser.vl["ACC_CONTROL"]["CANCEL_REQ"] == 1
+    assert "DISTANCE" not in parser.vl["ACC_CONTROL"]
+    assert parser.vl_all["ACC_CONTROL"]["CANCEL_REQ"] == [1]
+
+    with pytest.raises(RuntimeError):
+      CANParser("toyota_nodsu_pt_generated", [("ACC_CONTROL", 0, ["UNKNOWN_SIGNAL"])], 0)
+
+  def test_multiplexed_signals(self):
+    """Multiplexed signals are only decoded from frames whose multiplexer selects them, and keep their last values otherwise"""
+    dbc_file = "vw_mqb"
+    packer = CANPacker(dbc_file)
+    parsers = [CANParser(dbc_file, [("VIN_01", 0)], 0, lazy=lazy) for lazy in (False, True)]
+    subset_parser = CANParser(dbc_file, [("VIN_01", 0, ["VIN_4"])], 0)
+    assert "VIN_01_MUX" in subset_parser.vl["VIN_01"]
+
+    frames = [(10, 1, {"VIN_4": 44}), (20, 2, {"VIN_11": 111}), (30, 0, {"VIN_1": 1}), (40, 1, {"VIN_4": 45})]
+    for t, mux, values in frames:
+      msg = packer.make_can_msg("VIN_01", 0, {"VIN_01_MUX": mux, **values})
+      for parser in (*parsers, subset_parser):
+        parser.update([t, [msg]])
+
+    for parser in parsers:
+      assert parser.vl["VIN_01"]["VIN_01_MUX"] == 1
+      assert parser.vl["VIN_01"]["VIN_4"] == 45
+      assert parser.vl["VIN_01"]["VIN_11"] == 111
+      assert parser.vl["VIN_01"]["VIN_1"] == 1
+      assert parser.ts_nanos["VIN_01"]["VIN_4"] == 40
+      assert parser.ts_nanos["VIN_01"]["VIN_11"] == 20
+      assert parser.ts_nanos["VIN_01"]["VIN_1"] == 30
+
+    # vl_all only has values from frames that carried the signal
+    msgs = [packer.make_can_msg("VIN_01", 0, values) for values in ({"VIN_01_MUX": 1, "VIN_4": 46}, {"VIN_01_MUX": 2, "VIN_11": 112},
+                                                                      {"VIN_01_MUX": 1, "VIN_4": 46})]
+    for parser in parsers:
+      parser.update([50, msgs])
+      assert parser.vl_all["VIN_01"]["VIN_4"] == [46, 46]
+      assert parser.vl_all["VIN_01"]["VIN_11"] == [112]
+      assert parser.vl_all["VIN_01"]["VIN_1"] == []
+      assert parser.vl_all["VIN_01"]["VIN_01_MUX"] == [1, 2, 1]
+    assert subset_parser.vl["VIN_01"]["VIN_4"] == 45
+
+    nanos = np.arange(len(msgs), dtype=np.uint64)
+    ret = parsers[0].decode_batch("VIN_01", np.array([list(m[1]) for m in msgs], dtype=np.uint8), nanos)
+    assert list(ret.vals["VIN_4"][[0, 2]]) == [46, 46] and np.isnan(ret.vals["VIN_4"][1])
+    assert np.isnan(ret.vals["VIN_1"]).all()
+
   def test_disallow_duplicate_messages(self):
     CANParser("toyota_nodsu_pt_generated", [("ACC_CONTROL", 5)], 0)
 
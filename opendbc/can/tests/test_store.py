@@ -0,0 +1,70 @@
+import math
+
+import pytest
+
+from opendbc.can import CANPacker, CANParser
+from opendbc.can.dbc import get_checksum_context, get_dbc
+from opendbc.can.store import SignalStore
+
+
+class TestSignalStore:
+  def test_store(self, tmp_path):
+    dbc_file = "honda_civic_touring_2016_can_generated"
+    packer = CANPacker(dbc_file)
+    packer_bus1 = CANPacker(dbc_file)
+    parser = CANParser(dbc_file, [("STEERING_CONTROL", 0), ("VSA_STATUS", 0)], 0)
+
+    can_packets = []
+    for i in range(100):
+      msgs = [
+        packer.make_can_msg("STEERING_CONTROL", 0, {"STEER_TORQUE": i}),
+        packer.make_can_msg("VSA_STATUS", 0, {"USER_BRAKE": i % 10}),
+        packer_bus1.make_can_msg("STEERING_CONTROL", 1, {"STEER_TORQUE": -i}),
+      ]
+      can_packets.append((i * 10_000_000, msgs))
+
+    store = SignalStore.build(str(tmp_path), dbc_file, can_packets, 0)
+    assert set(store.messages) == {"STEERING_CONTROL", "VSA_STATUS"}
+
+    # re-open from disk
+    store = SignalStore(str(tmp_path))
+    ret = store.query("STEERING_CONTROL")
+    assert len(ret.nanos) == 100
+    assert ret.counter_valid.all() and ret.checksum_valid.all()
+    for t, msgs in can_packets:
+      parser.update([t, msgs])
+      idx = t // 10_000_000
+      assert ret.vals["STEER_TORQUE"][idx] == parser.vl["STEERING_CONTROL"]["STEER_TORQUE"]
+      assert store.query(420, ["USER_BRAKE"]).vals["USER_BRAKE"][idx] == pytest.approx(parser.vl["VSA_STATUS"]["USER_BRAKE"])
+
+    # time range queries are half open
+    ret = store.query("STEERING_CONTROL", ["STEER_TORQUE"], 200_000_000, 300_000_000)
+    assert list(ret.nanos) == [i * 10_000_000 for i in range(20, 30)]
+    assert list(ret.vals["STEER_TORQUE"]) == list(range(20, 30))
+    assert list(ret.vals) == ["STEER_TORQUE"]
+
+    with pytest.raises(KeyError):
+      store.query("STEERING_CONTROL", ["UNKNOWN_SIGNAL"])
+    with pytest.raises(KeyError):
+      store.query("POWERTRAIN_DATA")
+
+  def test_short_frames(self, tmp_path):
+    """Short frames are decoded at their own length, signals past the end are NaN"""
+    dbc_file = "honda_civic_touring_2016_can_generated"
+    packer = CANPacker(dbc_file)
+    msg = get_dbc(dbc_file).name_to_msg["STEERING_CONTROL"]
+
+    can_packets = []
+    for i in range(20):
+      address, dat, bus = packer.make_can_msg("STEERING_CONTROL", 0, {"STEER_TORQUE": i})
+      can_packets.append((i * 10_000_000, [(address, dat[:4] if i % 3 == 0 else dat, bus)]))
+
+    ret = SignalStore.build(str(tmp_path), dbc_file, can_packets, 0).query("STEERING_CONTROL")
+    assert list(ret.vals["STEER_TORQUE"]) == list(range(20))
+    checksum = get_checksum_context(msg.address, msg.sigs["CHECKSUM"])
+    for i, (_, [(_, dat, _)]) in enumerate(can_packets):
+      short = len(dat) < msg.size
+      assert math.isnan(ret.vals["CHECKSUM"][i]) == short
+      assert math.isnan(ret.vals["COUNTER"][i]) == short
+      # the checksum is calculated over the frame as sent, not a zero padded one
+      assert ret.checksum_valid[i] == (checksum(dat) == (0 if short else dat[4] & 0xf))
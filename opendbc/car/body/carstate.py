@@ -7,7 +7,7 @@ from opendbc.car.body.values import DBC
 class CarState(CarStateBase):
   def update(self, can_parsers) -> structs.CarState:
     cp = can_parsers[Bus.main]
-    ret = structs.CarState()
+    ret = self.new_car_state()
 
     ret.wheelSpeeds.fl = cp.vl['MOTORS_DATA']['SPEED_L']
     ret.wheelSpeeds.fr = cp.vl['MOTORS_DATA']['SPEED_R']
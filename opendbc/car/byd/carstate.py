@@ -53,7 +53,7 @@ class CarState(CarStateBase):
         self.gear_shifter_prev = self.gear_shifter
 
     def update(self, cp, cp_cam):
-        ret = structs.CarState()
+        ret = self.new_car_state()
 
         # Update steering state from STEER_MODULE_2 and STEERING_MODULE_ADAS
         if cp.vl_all["STEER_MODULE_2"]["COUNTER"] != self.counter_prev:
@@ -5,7 +5,7 @@ from opendbc.car.interfaces import CarInterfaceBase, CarStateBase, CarController
 class CarState(CarStateBase):
     def update(self, can_parsers):
         # Return minimal CarState for tests
-        return structs.CarState.new_message()
+        return self.new_car_state()
 
     def get_can_parsers(self, CP):
         # Return empty parsers for tests
@@ -1,5 +1,7 @@
+from collections.abc import Callable
+
 from opendbc.car import structs
-from opendbc.car.crc import CRC8J1850
+from opendbc.car.crc import CRC8J1850, cached_checksum_context
 from opendbc.car.chrysler.values import RAM_CARS
 
 GearShifter = structs.CarState.GearShifter
@@ -98,16 +100,16 @@ def chrysler_checksum(address: int, sig, d: bytearray) -> int:
   return (~checksum) & 0xFF
 
 
+def fca_giorgio_checksum_context(address: int, sig) -> Callable[[bytes], int]:
+  final_xor = {0xDE: 0x10, 0x106: 0xF6, 0x122: 0xF1}.get(address, 0x0A)
+
+  def calc(d: bytes) -> int:
+    crc = 0
+    for i in range(len(d) - 1):
+      crc = CRC8J1850[crc ^ d[i]]
+    return crc ^ final_xor
+  return calc
+
+
 def fca_giorgio_checksum(address: int, sig, d: bytearray) -> int:
-  crc = 0
-  for i in range(len(d) - 1):
-    crc ^= d[i]
-    crc = CRC8J1850[crc]
-  if address == 0xDE:
-    return crc ^ 0x10
-  elif address == 0x106:
-    return crc ^ 0xF6
-  elif address == 0x122:
-    return crc ^ 0xF1
-  else:
-    return crc ^ 0x0A
+  return cached_checksum_context(fca_giorgio_checksum_context, address, sig)(d)
@@ -1,3 +1,5 @@
+from collections.abc import Callable
+
 
 def _gen_crc8_table(poly: int) -> list[int]:
   table = []
@@ -28,3 +30,15 @@ def _gen_crc16_table(poly: int) -> list[int]:
 CRC8H2F = _gen_crc8_table(0x2F)
 CRC8J1850 = _gen_crc8_table(0x1D)
 CRC16_XMODEM = _gen_crc16_table(0x1021)
+
+
+_checksum_contexts: dict[tuple, Callable[[bytes], int]] = {}
+
+
+def cached_checksum_context(make_context: Callable[..., Callable[[bytes], int]], address: int, sig, *args) -> Callable[[bytes], int]:
+  """make_context(address, sig, *args), built once per address and checksum start bit, which is all a context depends on"""
+  key = (make_context, address, sig.start_bit, *args)
+  calc = _checksum_contexts.get(key)
+  if calc is None:
+    calc = _checksum_contexts[key] = make_context(address, sig, *args)
+  return calc
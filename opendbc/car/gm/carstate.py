@@ -45,7 +45,7 @@ class CarState(CarStateBase):
     cam_cp = can_parsers[Bus.cam]
     loopback_cp = can_parsers[Bus.loopback]
 
-    ret = structs.CarState()
+    ret = self.new_car_state()
 
     prev_cruise_buttons = self.cruise_buttons
     prev_distance_button = self.distance_button
@@ -55,7 +55,7 @@ class CarState(CarStateBase):
     if self.CP.enableBsm:
       cp_body = can_parsers[Bus.body]
 
-    ret = structs.CarState()
+    ret = self.new_car_state()
 
     # car params
     v_weight_v = [0., 1.]  # don't trust smooth speed at low values to avoid premature zero snapping
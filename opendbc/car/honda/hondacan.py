@@ -1,5 +1,8 @@
+from collections.abc import Callable
+
 from opendbc.car import CanBusBase
 from opendbc.car.common.conversions import Conversions as CV
+from opendbc.car.crc import cached_checksum_context
 from opendbc.car.honda.values import (HondaFlags, HONDA_BOSCH, HONDA_BOSCH_ALT_RADAR, HONDA_BOSCH_RADARLESS,
                                       HONDA_BOSCH_CANFD, CarControllerParams)
 
@@ -211,7 +214,7 @@ def create_radar_hud(packer, bus):
     'SET_TO_1': 0x01,
   }
 
-  return packer.make_can_msg('RADAR_HUD', bus, radar_hud_values)
+  return packer.make_can_msg('RADAR_HUD', bus, {}, radar_hud_values)
 
 
 def create_legacy_brake_command(packer, bus):
@@ -228,19 +231,27 @@ def spam_buttons_command(packer, CAN, button_val, car_fingerprint):
   return packer.make_can_msg("SCM_BUTTONS", bus, values)
 
 
-def honda_checksum(address: int, sig, d: bytearray) -> int:
+# sum of both nibbles of each byte value
+NIBBLE_SUMS = bytes((x & 0xF) + (x >> 4) for x in range(256))
+
+
+def honda_checksum_context(address: int, sig) -> Callable[[bytes], int]:
   s = 0
-  extended = address > 0x7FF
   addr = address
   while addr:
     s += addr & 0xF
     addr >>= 4
-  for i in range(len(d)):
-    x = d[i]
-    if i == len(d) - 1:
-      x >>= 4
-    s += (x & 0xF) + (x >> 4)
-  s = 8 - s
-  if extended:
-    s += 3
-  return s & 0xF
+  base = 8 - s + (3 if address > 0x7FF else 0)
+
+  def calc(d: bytes) -> int:
+    if not d:
+      return base & 0xF
+    if isinstance(d, memoryview):
+      d = d.tobytes()
+    # the low nibble of the last byte holds the checksum
+    return (base - sum(d.translate(NIBBLE_SUMS)) + (d[-1] & 0xF)) & 0xF
+  return calc
+
+
+def honda_checksum(address: int, sig, d: bytearray) -> int:
+  return cached_checksum_context(honda_checksum_context, address, sig)(d)
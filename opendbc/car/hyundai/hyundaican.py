@@ -129,17 +129,19 @@ def create_acc_commands(packer, enabled, accel, upper_jerk, idx, hud_control, se
   commands = []
 
   scc11_values = {
-    "MainMode_ACC": 1,
     "TauGapSet": hud_control.leadDistanceBars,
     "VSetDis": set_speed if enabled else 0,
     "AliveCounterACC": idx % 0x10,
+    }
+  scc11_static = {
+    "MainMode_ACC": 1,
     "ObjValid": 1, # close lead makes controls tighter
     "ACC_ObjStatus": 1, # close lead makes controls tighter
     "ACC_ObjLatPos": 0,
     "ACC_ObjRelSpd": 0,
     "ACC_ObjDist": 1, # close lead makes controls tighter
     }
-  commands.append(packer.make_can_msg("SCC11", 0, scc11_values))
+  commands.append(packer.make_can_msg("SCC11", 0, scc11_values, scc11_static))
 
   scc12_values = {
     "ACCMode": 2 if enabled and long_override else 1 if enabled else 0,
@@ -1,7 +1,9 @@
 import copy
+from binascii import crc_hqx
+from collections.abc import Callable
 import numpy as np
 from opendbc.car import CanBusBase
-from opendbc.car.crc import CRC16_XMODEM
+from opendbc.car.crc import cached_checksum_context
 from opendbc.car.hyundai.values import HyundaiFlags
 
 
@@ -241,18 +243,17 @@ def create_adrv_messages(packer, CAN, frame):
   return ret
 
 
+HKG_CAN_FD_LENGTH_XOR = {8: 0x5F29, 16: 0x041D, 24: 0x819D, 32: 0x9F5B}
+
+
+def hkg_can_fd_checksum_context(address: int, sig) -> Callable[[bytes], int]:
+  addr_bytes = bytes([address & 0xFF, (address >> 8) & 0xFF])
+
+  def calc(d: bytes) -> int:
+    # binascii.crc_hqx is the same CRC16 (XMODEM, polynomial 0x1021), computed in C
+    return crc_hqx(addr_bytes, crc_hqx(d[2:], 0)) ^ HKG_CAN_FD_LENGTH_XOR.get(len(d), 0)
+  return calc
+
+
 def hkg_can_fd_checksum(address: int, sig, d: bytearray) -> int:
-  crc = 0
-  for i in range(2, len(d)):
-    crc = ((crc << 8) ^ CRC16_XMODEM[(crc >> 8) ^ d[i]]) & 0xFFFF
-  crc = ((crc << 8) ^ CRC16_XMODEM[(crc >> 8) ^ ((address >> 0) & 0xFF)]) & 0xFFFF
-  crc = ((crc << 8) ^ CRC16_XMODEM[(crc >> 8) ^ ((address >> 8) & 0xFF)]) & 0xFFFF
-  if len(d) == 8:
-    crc ^= 0x5F29
-  elif len(d) == 16:
-    crc ^= 0x041D
-  elif len(d) == 24:
-    crc ^= 0x819D
-  elif len(d) == 32:
-    crc ^= 0x9F5B
-  return crc
+  return cached_checksum_context(hkg_can_fd_checksum_context, address, sig)(d)
@@ -16,7 +16,7 @@ from opendbc.car.common.basedir import BASEDIR
 from opendbc.car.common.conversions import Conversions as CV
 from opendbc.car.common.simple_kalman import KF1D, get_kalman_gain
 from opendbc.car.values import PLATFORMS
-from opendbc.can import CANParser
+from opendbc.can import CANParser, bucket_frames
 
 GearShifter = structs.CarState.GearShifter
 ButtonType = structs.CarState.ButtonEvent.Type
@@ -108,13 +108,16 @@ class CarInterfaceBase(ABC):
 
   DRIVABLE_GEARS: tuple[structs.CarState.GearShifter, ...] = ()
 
-  def __init__(self, CP: structs.CarParams):
+  def __init__(self, CP: structs.CarParams, double_buffered: bool = False):
     self.CP = CP
 
     self.frame = 0
     self.v_ego_cluster_seen = False
 
     self.CS: CarStateBase = self.CarState(CP)
+    if double_buffered:
+      # update() then alternates between two CarStates, so each one it returns is only valid until the update after next
+      self.CS.enable_double_buffering()
     self.can_parsers: dict[StrEnum, CANParser] = self.CS.get_can_parsers(CP)
 
     dbc_names = {bus: cp.dbc_name for bus, cp in self.can_parsers.items()}
@@ -242,10 +245,11 @@ class CarInterfaceBase(ABC):
     tune.torque.steeringAngleDeadzoneDeg = steering_angle_deadzone_deg
 
   def update(self, can_packets: list[tuple[int, list[CanData]]]) -> structs.CarState:
-    # parse can
+    # parse can, frames are grouped by bus and address once and shared by all parsers
+    buckets = bucket_frames(can_packets)
     for cp in self.can_parsers.values():
       if cp is not None:
-        cp.update(can_packets)
+        cp.update_buckets(buckets)
 
     # get CarState
     ret = self.CS.update(self.can_parsers)
@@ -279,6 +283,7 @@ class CarStateBase(ABC):
     self.CP = CP
     self.car_fingerprint = CP.carFingerprint
     self.out = structs.CarState()
+    self.out_buffers: tuple[structs.CarState, structs.CarState] | None = None
 
     self.cruise_buttons = 0
     self.left_blinker_cnt = 0
@@ -303,6 +308,17 @@ class CarStateBase(ABC):
   def update(self, can_parsers) -> structs.CarState:
     pass
 
+  def enable_double_buffering(self) -> None:
+    self.out_buffers = (self.out, structs.CarState())
+
+  def new_car_state(self) -> structs.CarState:
+    """CarState for update to fill in: a new one, or when double buffered, the buffer self.out isn't using, reset"""
+    if self.out_buffers is None:
+      return structs.CarState()
+    ret = self.out_buffers[1] if self.out is self.out_buffers[0] else self.out_buffers[0]
+    ret.reset()
+    return ret
+
   def parse_wheel_speeds(self, cs, fl, fr, rl, rr, unit=CV.KPH_TO_MS):
     cs.vEgoRaw = sum((fl, fr, rl, rr)) / 4 * unit * self.CP.wheelSpeedFactor
     cs.vEgo, cs.aEgo = self.update_speed_kf(cs.vEgoRaw)
@@ -4,4 +4,4 @@ from opendbc.car.interfaces import CarStateBase
 
 class CarState(CarStateBase):
   def update(self, *_) -> structs.CarState:
-    return structs.CarState()
+    return self.new_car_state()
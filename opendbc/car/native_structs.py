@@ -0,0 +1,180 @@
+"""
+Slotted pure-Python mirrors of capnp structs, generated from their schema. They're cheap to allocate and write every
+cycle, and only converted to capnp when serialized or handed to code expecting capnp, with to_capnp() or as_reader().
+"""
+import dataclasses
+from abc import abstractmethod
+from typing import Any, ClassVar
+
+import capnp
+
+_capnp = capnp.lib.capnp
+CAPNP_STRUCTS = (_capnp._DynamicStructBuilder, _capnp._DynamicStructReader)
+CAPNP_LISTS = (_capnp._DynamicListBuilder, _capnp._DynamicListReader)
+
+
+def _to_capnp_value(v):
+  if isinstance(v, NativeStruct):
+    return v.to_dict()
+  if isinstance(v, (list, tuple, *CAPNP_LISTS)):
+    return [_to_capnp_value(x) for x in v]
+  if isinstance(v, CAPNP_STRUCTS):
+    return v.to_dict()
+  if isinstance(v, _capnp._DynamicEnum):
+    return v.raw
+  return v
+
+
+def _from_capnp_value(v, cls: 'type[NativeStruct] | None'):
+  if isinstance(v, CAPNP_LISTS):
+    return [_from_capnp_value(x, cls) for x in v]
+  if isinstance(v, CAPNP_STRUCTS):
+    # structs defined outside the mirrored struct are kept as dicts
+    return cls.from_capnp(v) if cls is not None else v.to_dict()
+  if isinstance(v, _capnp._DynamicEnum):
+    return v.raw
+  return v
+
+
+def _copy_value(v):
+  if isinstance(v, NativeStruct):
+    return v.copy()
+  if isinstance(v, list):
+    return [_copy_value(x) for x in v]
+  return v
+
+
+class NativeStruct:
+  """Base of the generated mirrors. Enums are stored as their integer values, e.g. CarState.GearShifter.drive"""
+  __slots__ = ()
+  capnp_type: ClassVar[Any]
+  field_names: ClassVar[tuple[str, ...]]
+  struct_fields: ClassVar[dict[str, 'type[NativeStruct] | None']]  # struct and list of struct fields
+  defaults: ClassVar[tuple[tuple[str, Any], ...]]  # (name, default), None for struct and list fields
+
+  @classmethod
+  def new_message(cls, **kwargs):
+    return cls(**kwargs)
+
+  @classmethod
+  def from_capnp(cls, msg):
+    struct_fields = cls.struct_fields
+    return cls(**{name: _from_capnp_value(getattr(msg, name), struct_fields.get(name)) for name in cls.field_names})
+
+  def to_dict(self) -> dict[str, Any]:
+    return {name: _to_capnp_value(getattr(self, name)) for name in self.field_names}
+
+  def to_capnp(self):
+    """A capnp builder with the same contents"""
+    msg = self.capnp_type.new_message()
+    self._write(msg)
+    return msg
+
+  def _write(self, msg) -> None:
+    # fields still at their defaults are already set in a new message
+    struct_fields = self.struct_fields
+    for name, default in self.defaults:
+      v = getattr(self, name)
+      if isinstance(v, NativeStruct):
+        v._write(getattr(msg, name))
+      elif isinstance(v, list):
+        if v:
+          setattr(msg, name, _to_capnp_value(v))
+      elif name in struct_fields or v != default:
+        setattr(msg, name, _to_capnp_value(v))
+
+  def as_reader(self):
+    return self.to_capnp().as_reader()
+
+  def to_bytes(self) -> bytes:
+    return self.to_capnp().to_bytes()
+
+  def copy(self):
+    return type(self)(**{name: _copy_value(getattr(self, name)) for name in self.field_names})
+
+  # a mutable copy, like capnp's as_builder
+  as_builder = copy
+
+  @abstractmethod
+  def reset(self) -> None:
+    """Set every field back to its default in place, nested structs are reset rather than replaced"""
+
+
+def _make_reset(fields: list[tuple[str, Any, dataclasses.Field]]):
+  # (name, default value or factory, whether the factory is a nested struct)
+  defaults = []
+  for name, _, f in fields:
+    factory = f.default_factory
+    if factory is dataclasses.MISSING:
+      defaults.append((name, f.default, False))
+    else:
+      defaults.append((name, factory, isinstance(factory, type) and issubclass(factory, NativeStruct)))
+
+  def reset(self) -> None:
+    for name, default, nested in defaults:
+      # a struct assigned from elsewhere, e.g. a capnp one, is replaced
+      if nested and type(getattr(self, name)) is default:
+        getattr(self, name).reset()
+      else:
+        setattr(self, name, default() if callable(default) else default)
+  return reset
+
+
+def _default(slot, nested_by_id: dict[int, type[NativeStruct]]) -> dataclasses.Field:
+  kind = slot.type.which()
+  if kind == 'struct':
+    cls = nested_by_id.get(slot.type.struct.typeId)
+    return dataclasses.field(default_factory=cls if cls is not None else dict)
+  if kind == 'list':
+    return dataclasses.field(default_factory=list)
+  if kind == 'enum':
+    return dataclasses.field(default=slot.defaultValue.enum)
+  if kind == 'text':
+    return dataclasses.field(default=slot.defaultValue.text)
+  if kind == 'data':
+    return dataclasses.field(default=slot.defaultValue.data)
+  return dataclasses.field(default=getattr(slot.defaultValue, kind))
+
+
+def native_struct(module, module_name: str, qualname: str | None = None) -> type[NativeStruct]:
+  """
+  Generate the mirror of a capnp struct module and of the structs nested in it, which are attributes of the
+  generated class like in capnp, as are the nested enums. Unions and groups aren't supported.
+  """
+  schema = module.schema
+  qualname = qualname or schema.node.displayName.split(':')[-1]
+  if schema.node.struct.discriminantCount:
+    raise NotImplementedError(f"{qualname}: unions aren't supported")
+
+  namespace: dict[str, Any] = {}
+  nested_by_id: dict[int, type[NativeStruct]] = {}
+  for node in schema.node.nestedNodes:
+    sub = getattr(module, node.name)
+    if isinstance(sub, _capnp._StructModule):
+      sub = nested_by_id[node.id] = native_struct(sub, module_name, f"{qualname}.{node.name}")
+    namespace[node.name] = sub
+
+  fields = []
+  struct_fields = {}
+  for name, field in schema.fields.items():
+    proto = field.proto
+    if proto.which() != 'slot':
+      raise NotImplementedError(f"{qualname}.{name}: groups aren't supported")
+    fields.append((name, Any, _default(proto.slot, nested_by_id)))
+
+    typ = proto.slot.type
+    if typ.which() == 'list':
+      typ = typ.list.elementType
+    if typ.which() == 'struct':
+      struct_fields[name] = nested_by_id.get(typ.struct.typeId)
+
+  defaults = tuple((name, None if f.default is dataclasses.MISSING else f.default) for name, _, f in fields)
+  reset = _make_reset(fields)
+  reset.__qualname__ = f"{qualname}.reset"
+  namespace |= {'capnp_type': module, 'field_names': tuple(f[0] for f in fields), 'struct_fields': struct_fields, 'defaults': defaults,
+                'reset': reset}
+  cls = dataclasses.make_dataclass(qualname.split('.')[-1], fields, bases=(NativeStruct,), namespace=namespace,
+                                   slots=True, kw_only=True)
+  cls.__qualname__ = qualname
+  cls.__module__ = module_name
+  return cls
@@ -29,7 +29,7 @@ class CarState(CarStateBase):
     cp_cam = can_parsers[Bus.cam]
     cp_adas = can_parsers[Bus.adas]
 
-    ret = structs.CarState()
+    ret = self.new_car_state()
 
     prev_distance_button = self.distance_button
     self.distance_button = cp.vl["CRUISE_THROTTLE"]["FOLLOW_DISTANCE_BUTTON"]
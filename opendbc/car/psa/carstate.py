@@ -13,7 +13,7 @@ class CarState(CarStateBase):
     cp = can_parsers[Bus.main]
     cp_adas = can_parsers[Bus.adas]
     cp_cam = can_parsers[Bus.cam]
-    ret = structs.CarState()
+    ret = self.new_car_state()
 
     # car speed
     self.parse_wheel_speeds(ret,
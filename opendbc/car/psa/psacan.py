@@ -1,9 +1,22 @@
-def psa_checksum(address: int, sig, d: bytearray) -> int:
+from collections.abc import Callable
+
+from opendbc.car.crc import cached_checksum_context
+
+
+def psa_checksum_context(address: int, sig) -> Callable[[bytes], int]:
   chk_ini = {0x452: 0x4, 0x38D: 0x7, 0x42D: 0xC}.get(address, 0xB)
   byte = sig.start_bit // 8
-  d[byte] &= 0x0F if sig.start_bit % 8 >= 4 else 0xF0
-  checksum = sum((b >> 4) + (b & 0xF) for b in d)
-  return (chk_ini - checksum) & 0xF
+  high_nibble = sig.start_bit % 8 >= 4
+
+  def calc(d: bytes) -> int:
+    # the checksum's own nibble is left out of the sum
+    checksum = sum((b >> 4) + (b & 0xF) for b in d) - ((d[byte] >> 4) if high_nibble else (d[byte] & 0xF))
+    return (chk_ini - checksum) & 0xF
+  return calc
+
+
+def psa_checksum(address: int, sig, d: bytearray) -> int:
+  return cached_checksum_context(psa_checksum_context, address, sig)(d)
 
 
 def create_lka_steering(packer, lat_active: bool, apply_angle: float, status: int):
@@ -1,6 +1,7 @@
 import os
 import capnp
 from opendbc.car.common.basedir import BASEDIR
+from opendbc.car.native_structs import native_struct
 
 # TODO: remove car from cereal/__init__.py and always import from opendbc
 try:
@@ -9,12 +10,14 @@ except ImportError:
   capnp.remove_import_hook()
   car = capnp.load(os.path.join(BASEDIR, "car.capnp"))
 
-CarState = car.CarState
-RadarData = car.RadarData
-CarControl = car.CarControl
+# written every cycle, so these are native Python mirrors of the capnp structs in car,
+# converted with to_capnp() or as_reader() when serialized
+CarState = native_struct(car.CarState, __name__)
+RadarData = native_struct(car.RadarData, __name__)
+CarControl = native_struct(car.CarControl, __name__)
 CarParams = car.CarParams
 
-CarStateT = capnp.lib.capnp._StructModule
-RadarDataT = capnp.lib.capnp._StructModule
-CarControlT = capnp.lib.capnp._StructModule
+CarStateT = CarState
+RadarDataT = RadarData
+CarControlT = CarControl
 CarParamsT = capnp.lib.capnp._StructModule
@@ -1,4 +1,7 @@
+from collections.abc import Callable
+
 from opendbc.car import structs
+from opendbc.car.crc import cached_checksum_context
 from opendbc.car.subaru.values import CanBus
 
 VisualAlert = structs.CarControl.HUDControl.VisualAlert
@@ -325,12 +328,17 @@ def create_preglobal_es_distance(packer, cruise_button, es_distance_msg):
   return packer.make_can_msg("ES_Distance", CanBus.main, values)
 
 
-def subaru_checksum(address: int, sig, d: bytearray) -> int:
+def subaru_checksum_context(address: int, sig) -> Callable[[bytes], int]:
   s = 0
   addr = address
   while addr:
     s += addr & 0xFF
     addr >>= 8
-  for i in range(1, len(d)):
-    s += d[i]
-  return s & 0xFF
+
+  def calc(d: bytes) -> int:
+    return (s + sum(d) - (d[0] if d else 0)) & 0xFF
+  return calc
+
+
+def subaru_checksum(address: int, sig, d: bytearray) -> int:
+  return cached_checksum_context(subaru_checksum_context, address, sig)(d)
@@ -1,4 +1,7 @@
+from collections.abc import Callable
+
 from opendbc.car.common.conversions import Conversions as CV
+from opendbc.car.crc import cached_checksum_context
 from opendbc.car.tesla.values import CANBUS, CarControllerParams
 
 
@@ -43,10 +46,14 @@ class TeslaCAN:
     return self.packer.make_can_msg("APS_eacMonitor", CANBUS.party, values)
 
 
-def tesla_checksum(address: int, sig, d: bytearray) -> int:
-  checksum = (address & 0xFF) + ((address >> 8) & 0xFF)
+def tesla_checksum_context(address: int, sig) -> Callable[[bytes], int]:
+  base = (address & 0xFF) + ((address >> 8) & 0xFF)
   checksum_byte = sig.start_bit // 8
-  for i in range(len(d)):
-    if i != checksum_byte:
-      checksum += d[i]
-  return checksum & 0xFF
+
+  def calc(d: bytes) -> int:
+    return (base + sum(d) - (d[checksum_byte] if checksum_byte < len(d) else 0)) & 0xFF
+  return calc
+
+
+def tesla_checksum(address: int, sig, d: bytearray) -> int:
+  return cached_checksum_context(tesla_checksum_context, address, sig)(d)
@@ -0,0 +1,65 @@
+import math
+import pickle
+
+import pytest
+
+from opendbc.car import structs
+
+
+class TestNativeStructs:
+  @pytest.mark.parametrize("native", [structs.CarState, structs.CarControl, structs.RadarData])
+  def test_defaults_match_capnp(self, native):
+    """A new mirror converts to the same contents as a new capnp message"""
+    assert native.field_names == tuple(native.capnp_type.schema.fields.keys())
+    assert native.from_capnp(native().as_reader()) == native.from_capnp(native.capnp_type.new_message()) == native()
+
+  def test_round_trip(self):
+    CS = structs.CarState(vEgo=1.5, canValid=True, gearShifter=structs.CarState.GearShifter.drive)
+    CS.cruiseState.speed = 20.0
+    CS.wheelSpeeds.fl = 2.0
+    CS.buttonEvents = [structs.CarState.ButtonEvent(pressed=True, type=structs.CarState.ButtonEvent.Type.accelCruise)]
+
+    reader = CS.as_reader()
+    assert reader.vEgo == 1.5
+    assert reader.gearShifter == 'drive'
+    assert reader.cruiseState.speed == 20.0
+    assert reader.buttonEvents[0].type == 'accelCruise'
+    assert structs.CarState.from_capnp(reader) == CS
+    assert pickle.loads(pickle.dumps(CS)) == CS
+
+    RD = structs.RadarData(points=[structs.RadarData.RadarPoint(trackId=3, dRel=10.0, aRel=math.nan)])
+    RD.errors.canError = True
+    reader = RD.as_reader()
+    assert reader.errors.canError and reader.points[0].trackId == 3 and math.isnan(reader.points[0].aRel)
+
+  def test_copy(self):
+    CC = structs.CarControl(enabled=True)
+    CC.actuators.accel = 1.0
+    copied = CC.copy()
+    copied.actuators.accel = 2.0
+    assert CC.actuators.accel == 1.0 and copied.enabled
+
+    # capnp values assigned into a mirror are converted too
+    CS = structs.CarState(wheelSpeeds=structs.car.CarState.WheelSpeeds.new_message(fl=5.0))
+    assert CS.as_reader().wheelSpeeds.fl == 5.0
+
+  def test_reset(self):
+    CS = structs.CarState(vEgo=1.5, gearShifter=structs.CarState.GearShifter.drive)
+    cruise_state = CS.cruiseState
+    cruise_state.speed = 20.0
+    CS.buttonEvents = [structs.CarState.ButtonEvent(pressed=True)]
+    CS.wheelSpeeds = structs.car.CarState.WheelSpeeds.new_message(fl=5.0)
+
+    CS.reset()
+    assert CS == structs.CarState()
+    assert CS.cruiseState is cruise_state
+    assert type(CS.wheelSpeeds) is structs.CarState.WheelSpeeds
+
+    # lists aren't shared between resets
+    CS.buttonEvents.append(structs.CarState.ButtonEvent())
+    assert structs.CarState().buttonEvents == []
+
+  def test_unknown_field(self):
+    CS = structs.CarState()
+    with pytest.raises(AttributeError):
+      CS.notAField = 1  # type: ignore[attr-defined]
@@ -1,3 +1,6 @@
+from collections.abc import Callable
+
+from opendbc.car.crc import cached_checksum_context
 from opendbc.car.structs import CarParams
 
 SteerControlType = CarParams.SteerControlType
@@ -100,14 +103,16 @@ def create_acc_cancel_command(packer):
 
 def create_fcw_command(packer, fcw):
   values = {
-    "PCS_INDICATOR": 1,  # PCS turned off
     "FCW": fcw,
+  }
+  static = {
+    "PCS_INDICATOR": 1,  # PCS turned off
     "SET_ME_X20": 0x20,
     "SET_ME_X10": 0x10,
     "PCS_OFF": 1,
     "PCS_SENSITIVITY": 0,
   }
-  return packer.make_can_msg("PCS_HUD", 0, values)
+  return packer.make_can_msg("PCS_HUD", 0, values, static)
 
 
 def create_ui_command(packer, steer, chime, left_line, right_line, left_lane_depart, right_lane_depart, enabled, stock_lkas_hud):
@@ -117,8 +122,10 @@ def create_ui_command(packer, steer, chime, left_line, right_line, left_lane_dep
     "RIGHT_LINE": 3 if right_lane_depart else 1 if right_line else 2,
     "LEFT_LINE": 3 if left_lane_depart else 1 if left_line else 2,
     "BARRIERS": 1 if enabled else 0,
+  }
 
-    # static signals
+  # static signals, packed once per set of values
+  static = {
     "SET_ME_X02": 2,
     "SET_ME_X01": 1,
     "LKAS_STATUS": 1,
@@ -144,7 +151,7 @@ def create_ui_command(packer, steer, chime, left_line, right_line, left_lane_dep
   # lane sway functionality
   # not all cars have LKAS_HUD — update with camera values if available
   if len(stock_lkas_hud):
-    values.update({s: stock_lkas_hud[s] for s in [
+    static.update({s: stock_lkas_hud[s] for s in [
       "LANE_SWAY_FLD",
       "LANE_SWAY_BUZZER",
       "LANE_SWAY_WARNING",
@@ -152,15 +159,20 @@ def create_ui_command(packer, steer, chime, left_line, right_line, left_lane_dep
       "LANE_SWAY_TOGGLE",
     ]})
 
-  return packer.make_can_msg("LKAS_HUD", 0, values)
+  return packer.make_can_msg("LKAS_HUD", 0, values, static)
 
 
-def toyota_checksum(address: int, sig, d: bytearray) -> int:
-  s = len(d)
+def toyota_checksum_context(address: int, sig) -> Callable[[bytes], int]:
+  s = 0
   addr = address
   while addr:
     s += addr & 0xFF
     addr >>= 8
-  for i in range(len(d) - 1):
-    s += d[i]
-  return s & 0xFF
+
+  def calc(d: bytes) -> int:
+    return (s + len(d) + sum(d) - (d[-1] if d else 0)) & 0xFF
+  return calc
+
+
+def toyota_checksum(address: int, sig, d: bytearray) -> int:
+  return cached_checksum_context(toyota_checksum_context, address, sig)(d)
@@ -52,7 +52,7 @@ class CarState(CarStateBase):
     elif self.CP.flags & VolkswagenFlags.MLB:
       return self.update_mlb(pt_cp, cam_cp, ext_cp)
 
-    ret = structs.CarState()
+    ret = self.new_car_state()
 
     if self.CP.transmissionType == TransmissionType.direct:
       ret.gearShifter = self.parse_gear_shifter(self.CCP.shifter_values.get(pt_cp.vl["Motor_EV_01"]["MO_Waehlpos"], None))
@@ -140,7 +140,7 @@ class CarState(CarStateBase):
     return ret
 
   def update_pq(self, pt_cp, cam_cp, ext_cp) -> structs.CarState:
-    ret = structs.CarState()
+    ret = self.new_car_state()
 
     # vEgo obtained from Bremse_1 vehicle speed rather than Bremse_3 wheel speeds because Bremse_3 isn't present on NSF
     ret.vEgoRaw = pt_cp.vl["Bremse_1"]["BR1_Rad_kmh"] * CV.KPH_TO_MS
@@ -231,7 +231,7 @@ class CarState(CarStateBase):
     return ret
 
   def update_mlb(self, pt_cp, cam_cp, ext_cp) -> structs.CarState:
-    ret = structs.CarState()
+    ret = self.new_car_state()
 
     self.parse_wheel_speeds(ret,
       pt_cp.vl["ESP_03"]["ESP_VL_Radgeschw"],
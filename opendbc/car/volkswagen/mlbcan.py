@@ -1,4 +1,7 @@
-from opendbc.car.volkswagen.mqbcan import (volkswagen_mqb_meb_checksum, xor_checksum,
+from collections.abc import Callable
+
+from opendbc.car.crc import cached_checksum_context
+from opendbc.car.volkswagen.mqbcan import (volkswagen_mqb_meb_checksum_context, xor_checksum_context,
                                            create_lka_hud_control as mqb_create_lka_hud_control)
 
 # TODO: Parameterize the hca control type (5 vs 7) and consolidate with MQB (and PQ?)
@@ -52,20 +55,26 @@ def create_acc_hud_control(packer, bus, acc_hud_status, set_speed, lead_distance
   values = {}
   return packer.make_can_msg("ACC_02", bus, values)
 
-def volkswagen_mlb_checksum(address: int, sig, d: bytearray) -> int:
-  xor_starting_value = {
-    0x109: 0x08, # ACC_01
-    0x111: 0x10, # TSK_05
-    0x30C: 0x0F, # ACC_02
-    0x324: 0x27, # ACC_04
-    0x10B: 0xA,  # LS_01
-    0x10D: 0x0C, # ACC_05
-    0x10F: 0x0E, # ACC_0x10F
-    0x311: 0x12, # ACC_0x311
-    0x397: 0x94, # LDW_02
-    0x10C: 0x0D, # TSK_02
-  }
-  if address in xor_starting_value:
-    return xor_checksum(address, sig, d, xor_starting_value[address])
+VOLKSWAGEN_MLB_XOR_STARTING_VALUES = {
+  0x109: 0x08, # ACC_01
+  0x111: 0x10, # TSK_05
+  0x30C: 0x0F, # ACC_02
+  0x324: 0x27, # ACC_04
+  0x10B: 0xA,  # LS_01
+  0x10D: 0x0C, # ACC_05
+  0x10F: 0x0E, # ACC_0x10F
+  0x311: 0x12, # ACC_0x311
+  0x397: 0x94, # LDW_02
+  0x10C: 0x0D, # TSK_02
+}
+
+
+def volkswagen_mlb_checksum_context(address: int, sig) -> Callable[[bytes], int]:
+  if address in VOLKSWAGEN_MLB_XOR_STARTING_VALUES:
+    return xor_checksum_context(address, sig, VOLKSWAGEN_MLB_XOR_STARTING_VALUES[address])
   else:
-    return volkswagen_mqb_meb_checksum(address, sig, d)
+    return volkswagen_mqb_meb_checksum_context(address, sig)
+
+
+def volkswagen_mlb_checksum(address: int, sig, d: bytearray) -> int:
+  return cached_checksum_context(volkswagen_mlb_checksum_context, address, sig)(d)
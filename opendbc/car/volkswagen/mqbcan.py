@@ -1,4 +1,6 @@
-from opendbc.car.crc import CRC8H2F
+from collections.abc import Callable
+
+from opendbc.car.crc import CRC8H2F, cached_checksum_context
 
 
 def create_steering_control(packer, bus, apply_torque, lkas_enabled):
@@ -172,26 +174,37 @@ def create_aeb_hud(packer, aeb_supported, fcw_active):
   return packer.make_can_msg("ACC_15", 0, values)
 
 
-def volkswagen_mqb_meb_checksum(address: int, sig, d: bytearray) -> int:
-  crc = 0xFF
-  for i in range(1, len(d)):
-    crc ^= d[i]
-    crc = CRC8H2F[crc]
-  counter = d[1] & 0x0F
+def volkswagen_mqb_meb_checksum_context(address: int, sig) -> Callable[[bytes], int]:
   const = VOLKSWAGEN_MQB_MEB_CONSTANTS.get(address)
-  if const:
-    crc ^= const[counter]
-    crc = CRC8H2F[crc]
-  return crc ^ 0xFF
 
+  def calc(d: bytes) -> int:
+    crc = 0xFF
+    for i in range(1, len(d)):
+      crc = CRC8H2F[crc ^ d[i]]
+    if const:
+      crc = CRC8H2F[crc ^ const[d[1] & 0x0F]]
+    return crc ^ 0xFF
+  return calc
 
-def xor_checksum(address: int, sig, d: bytearray, initial_value: int = 0) -> int:
-  checksum = initial_value
+
+def volkswagen_mqb_meb_checksum(address: int, sig, d: bytearray) -> int:
+  return cached_checksum_context(volkswagen_mqb_meb_checksum_context, address, sig)(d)
+
+
+def xor_checksum_context(address: int, sig, initial_value: int = 0) -> Callable[[bytes], int]:
   checksum_byte = sig.start_bit // 8
-  for i in range(len(d)):
-    if i != checksum_byte:
-      checksum ^= d[i]
-  return checksum
+
+  def calc(d: bytes) -> int:
+    checksum = initial_value
+    for i in range(len(d)):
+      if i != checksum_byte:
+        checksum ^= d[i]
+    return checksum
+  return calc
+
+
+def xor_checksum(address: int, sig, d: bytearray, initial_value: int = 0) -> int:
+  return cached_checksum_context(xor_checksum_context, address, sig, initial_value)(d)
 
 
 VOLKSWAGEN_MQB_MEB_CONSTANTS: dict[int, list[int]] = {
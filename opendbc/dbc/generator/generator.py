@@ -2,12 +2,17 @@
 import os
 import re
 import glob
+import json
+import hashlib
+import argparse
 import subprocess
+from concurrent.futures import ProcessPoolExecutor
 
 generator_path = os.path.dirname(os.path.realpath(__file__))
 opendbc_root = os.path.join(generator_path, '../')
 include_pattern = re.compile(r'CM_ "IMPORT (.*?)";\n')
 generated_suffix = '_generated.dbc'
+manifest_filename = '.generator_manifest.json'
 
 
 def read_dbc(src_dir: str, filename: str) -> str:
@@ -15,6 +20,18 @@ def read_dbc(src_dir: str, filename: str) -> str:
     return file_in.read()
 
 
+def hash_file(path: str) -> str | None:
+  try:
+    with open(path, 'rb') as f:
+      return hashlib.sha256(f.read()).hexdigest()
+  except FileNotFoundError:
+    return None
+
+
+def hash_inputs(paths: list[str]) -> dict[str, str | None]:
+  return {os.path.relpath(p, generator_path): hash_file(p) for p in sorted(paths)}
+
+
 def create_dbc(src_dir: str, filename: str, output_path: str):
   dbc_file_in = read_dbc(src_dir, filename)
 
@@ -39,27 +56,114 @@ def create_dbc(src_dir: str, filename: str, output_path: str):
     dbc_file_out.write(core_dbc)
 
 
-def create_all(output_path: str):
-  # clear out old DBCs
-  for f in glob.glob(f"{output_path}/*{generated_suffix}"):
-    os.remove(f)
+def dbc_inputs(src_dir: str, filename: str) -> list[str]:
+  """The DBC itself and every file it imports"""
+  includes = include_pattern.findall(read_dbc(src_dir, filename))
+  return [os.path.join(src_dir, f) for f in [filename, *includes]]
+
+
+def script_inputs(src_dir: str) -> list[str]:
+  """Python sources of a generator directory, along with the other files they mention by name"""
+  sources = sorted(glob.glob(f"{src_dir}/*.py"))
+  code = ""
+  for f in sources:
+    with open(f, encoding='utf-8') as file_in:
+      code += file_in.read()
+  referenced = [f for f in glob.glob(f"{src_dir}/*") if f not in sources and os.path.basename(f) in code]
+  return sources + referenced
 
-  # run python generator scripts first
-  for f in glob.glob(f"{generator_path}/*/*.py"):
-    subprocess.check_call(f)
 
+def snapshot(src_dir: str) -> dict[str, tuple[int, int]]:
+  return {f: (os.stat(f).st_mtime_ns, os.stat(f).st_size) for f in glob.glob(f"{src_dir}/*")}
+
+
+def run_scripts(src_dir: str) -> list[str]:
+  """Run a directory's python generator scripts, returning the files they wrote"""
+  before = snapshot(src_dir)
+  for f in sorted(glob.glob(f"{src_dir}/*.py")):
+    subprocess.check_call(f)
+  return sorted(f for f, stat in snapshot(src_dir).items() if before.get(f) != stat)
+
+
+def load_manifest(output_path: str) -> dict:
+  try:
+    with open(os.path.join(output_path, manifest_filename), encoding='utf-8') as f:
+      manifest = json.load(f)
+  except (FileNotFoundError, json.JSONDecodeError):
+    return {}
+  # changes to the generator itself invalidate everything
+  return manifest if manifest.get('generator') == hash_file(os.path.realpath(__file__)) else {}
+
+
+def save_manifest(output_path: str, scripts: dict, dbcs: dict) -> None:
+  manifest = {'generator': hash_file(os.path.realpath(__file__)), 'scripts': scripts, 'dbcs': dbcs}
+  with open(os.path.join(output_path, manifest_filename), 'w', encoding='utf-8') as f:
+    json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def create_all(output_path: str, incremental: bool = False, jobs: int | None = None):
+  """
+  Generate every DBC. In incremental mode, the inputs of each output are recorded with their content hashes,
+  and only outputs with changed inputs are generated again.
+  """
+  manifest = load_manifest(output_path) if incremental else {}
+  old_scripts = manifest.get('scripts', {})
+  old_dbcs = manifest.get('dbcs', {})
+
+  if not incremental:
+    # clear out old DBCs
+    for f in glob.glob(f"{output_path}/*{generated_suffix}"):
+      os.remove(f)
+
+  # run python generator scripts first, each directory's scripts are independent of the others'
+  scripts = {}
+  stale_dirs = []
+  for src_dir in sorted({os.path.dirname(f) for f in glob.glob(f"{generator_path}/*/*.py")}):
+    key = os.path.relpath(src_dir, generator_path)
+    old = old_scripts.get(key)
+    inputs = hash_inputs(script_inputs(src_dir))
+    if old is not None and old['inputs'] == inputs and all(os.path.exists(os.path.join(generator_path, f)) for f in old['outputs']):
+      scripts[key] = old
+    else:
+      stale_dirs.append(src_dir)
+
+  with ProcessPoolExecutor(max_workers=jobs) as pool:
+    for src_dir, outputs in zip(stale_dirs, pool.map(run_scripts, stale_dirs), strict=True):
+      # hash inputs after running, since scripts may write files other scripts of the directory read
+      scripts[os.path.relpath(src_dir, generator_path)] = {
+        'inputs': hash_inputs(script_inputs(src_dir)),
+        'outputs': [os.path.relpath(f, generator_path) for f in outputs],
+      }
+
+  dbcs = {}
   for src_dir, _, filenames in os.walk(generator_path):
     if src_dir == generator_path:
       continue
 
-    #print(src_dir)
     for filename in filenames:
       if filename.startswith('_') or not filename.endswith('.dbc'):
         continue
 
-      #print(filename)
+      output_filename = filename.replace('.dbc', generated_suffix)
+      inputs = hash_inputs(dbc_inputs(src_dir, filename))
+      dbcs[output_filename] = {'inputs': inputs}
+      if old_dbcs.get(output_filename) == dbcs[output_filename] and os.path.exists(os.path.join(output_path, output_filename)):
+        continue
+
       create_dbc(src_dir, filename, output_path)
 
+  if incremental:
+    # outputs whose source is gone
+    for f in glob.glob(f"{output_path}/*{generated_suffix}"):
+      if os.path.basename(f) in old_dbcs and os.path.basename(f) not in dbcs:
+        os.remove(f)
+
+  save_manifest(output_path, scripts, dbcs)
+
 
 if __name__ == "__main__":
-  create_all(opendbc_root)
+  parser = argparse.ArgumentParser(description="Generate DBCs from the sources in opendbc/dbc/generator")
+  parser.add_argument("--incremental", action="store_true", help="only regenerate outputs whose inputs changed")
+  parser.add_argument("-j", "--jobs", type=int, default=None, help="number of generator scripts to run in parallel")
+  args = parser.parse_args()
+  create_all(opendbc_root, args.incremental, args.jobs)
@@ -0,0 +1,68 @@
+import glob
+import os
+import shutil
+
+import pytest
+
+import opendbc
+from opendbc.dbc.generator import generator
+
+
+def set_mtimes(paths: list[str]) -> None:
+  for f in paths:
+    os.utime(f, ns=(0, 0))
+
+
+def touched(paths: list[str]) -> set[str]:
+  """Files among paths written since set_mtimes"""
+  return {os.path.basename(f) for f in paths if not os.path.exists(f) or os.stat(f).st_mtime_ns != 0}
+
+
+class TestGenerator:
+  @pytest.fixture(autouse=True)
+  def setup(self, tmp_path, monkeypatch):
+    # generate from a copy of the sources, so they can be edited
+    self.src = str(tmp_path / "generator")
+    shutil.copytree(generator.generator_path, self.src, ignore=shutil.ignore_patterns("__pycache__"))
+    monkeypatch.setattr(generator, "generator_path", self.src)
+    monkeypatch.setenv("PYTHONPATH", os.path.dirname(os.path.dirname(opendbc.__file__)))
+    self.out = str(tmp_path / "out")
+    os.makedirs(self.out)
+
+    generator.create_all(self.out, incremental=True, jobs=2)
+    self.outputs = sorted(glob.glob(f"{self.out}/*{generator.generated_suffix}"))
+    self.script_outputs = [os.path.join(self.src, f) for s in generator.load_manifest(self.out)['scripts'].values() for f in s['outputs']]
+    assert len(self.outputs) and len(self.script_outputs)
+    set_mtimes(self.outputs + self.script_outputs)
+
+  def test_incremental_include(self):
+    """Editing a common include only regenerates the DBCs importing it"""
+    with open(os.path.join(self.src, "honda", "_honda_common.dbc"), "a", encoding="utf-8") as f:
+      f.write('\nCM_ "edited";\n')
+    generator.create_all(self.out, incremental=True, jobs=2)
+
+    expected = {f.replace(".dbc", generator.generated_suffix) for f in os.listdir(os.path.join(self.src, "honda"))
+                if not f.startswith("_") and "_honda_common.dbc" in generator.read_dbc(os.path.join(self.src, "honda"), f)}
+    assert len(expected) > 1 and all(f.startswith(("honda_", "acura_")) for f in expected)
+    assert touched(self.outputs) == expected
+    assert touched(self.script_outputs) == set()
+
+  def test_incremental_deleted_script_output(self):
+    """A missing script output reruns only the scripts of its directory"""
+    deleted = os.path.join(self.src, "tesla", "tesla_radar_bosch.dbc")
+    os.remove(deleted)
+    generator.create_all(self.out, incremental=True, jobs=2)
+
+    assert os.path.exists(deleted)
+    assert touched(self.script_outputs) == {"tesla_radar_bosch.dbc", "tesla_radar_continental.dbc"}
+    assert touched(self.outputs) == set()
+
+  def test_full_rebuild(self):
+    """A non-incremental run regenerates everything, removing stale outputs"""
+    stale = os.path.join(self.out, f"stale{generator.generated_suffix}")
+    open(stale, "w").close()
+    generator.create_all(self.out)
+
+    assert not os.path.exists(stale)
+    assert touched(self.outputs) == {os.path.basename(f) for f in self.outputs}
+    assert touched(self.script_outputs) == {os.path.basename(f) for f in self.script_outputs}